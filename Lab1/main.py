@@ -1,105 +1,123 @@
+import math
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
-from scipy.sparse.csgraph import floyd_warshall
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology.export import export_adjacency_matrix, print_adjacency_matrix
+from topology.metrics import calculate_topological_properties
+from topology.profiling import matrix_details, stage, write_trace
+from topology.render import (DEFAULT_DPI, add_edges, draw_edge_groups, draw_nodes, finish_figure,
+                             position_array)
+from topology.rules import LinkRule, build_adjacency_matrix
+from topology.symmetry import cluster_rotation
 
 PROCESSORS_IN_CLUSTER = 6
+EXPORT_PATH = None  # Файл для збереження матриці суміжності (.txt, .mtx або .npz), None — не зберігати
+
+
+# Зв'язки між процесорами в межах одного кластера
+INTRA_CLUSTER_LINKS = [
+    (0, 2),  # 1-3 чорний
+    (1, 2),  # 2-3 чорний
+    (2, 3),  # 3-4 чорний
+    (3, 4),  # 4-5 чорний
+    (3, 5),  # 4-6 чорний
+]
+
+
+def inter_cluster_links(num_clusters):
+    return [
+        # Зв'язки первинного кластера з кожним вторинним
+        LinkRule(0, 0, cluster=0, first=1),  # Первинний 1 з вторинним 1 синій
+        LinkRule(1, 1, cluster=0, first=1),  # Первинний 2 з вторинним 2 світло-зелений
+        LinkRule(2, 2, cluster=0, first=1),  # Первинний 3 з вторинним 3 жовтий
+        LinkRule(3, 3, cluster=0, first=1),  # Первинний 4 з вторинним 4 бірюзовий
+        LinkRule(4, 4, cluster=0, first=1),  # Первинний 5 з вторинним 5 червоний
+        LinkRule(5, 5, cluster=0, first=1),  # Первинний 6 з вторинним 6 темно-зелений
+
+        # Нерегулярні зв'язки між вторинними кластерами
+        LinkRule(0, 1, shift=1, first=1, wrap=1, wrap_skip=(1,)),  # червоний пунктир
+        LinkRule(4, 4, shift=1, first=2, wrap=1),  # синій пунктир
+        LinkRule(2, 2, shift=2, first=2, period=2, residues=(0,), wrap=2, wrap_skip=(2,)),  # жовтий пунктир
+        LinkRule(3, 2, shift=-1, first=2, period=2, residues=(0,)),  # світло-зелений пунктир
+        LinkRule(3, 2, shift=1, first=2, period=2, residues=(0,), wrap=1),  # світло-зелений пунктир
+        LinkRule(3, 3, shift=2, first=2, period=2, residues=(1,), wrap=1),  # бірюзовий пунктир
+    ]
 
 
 def create_adjacency_matrix(num_clusters):
+    return build_adjacency_matrix(PROCESSORS_IN_CLUSTER, num_clusters, INTRA_CLUSTER_LINKS,
+                                  inter_cluster_links(num_clusters))
+
+
+# Кандидати в симетрії зірки: циклічні зсуви вторинних кластерів.
+# calculate_topological_properties залишає лише ті, що зберігають усі зв'язки.
+def cluster_symmetries(num_clusters):
+    return [cluster_rotation(num_clusters, PROCESSORS_IN_CLUSTER, shift, first_cluster=1) for shift in (1, 2)]
+
+
+# Від цієї кількості кластерів характеристики зірки задаються замкненими формулами
+STAR_FORMULA_MIN_CLUSTERS = 7
+
+
+# Замкнені формули для num_clusters >= STAR_FORMULA_MIN_CLUSTERS, окремо для парної та непарної
+# кількості кластерів. Виведені з обчислених значень і перевірені рушієм для 7..400, 601, 800 і 1001
+# кластерів (див. verify_star_formulas). W — сума відстаней по всіх упорядкованих парах процесорів.
+def star_formulas(num_clusters):
+    odd = num_clusters % 2
     num_processors = PROCESSORS_IN_CLUSTER * num_clusters
-    adjacency_matrix = np.zeros((num_processors, num_processors), dtype=int)
-
-    for cluster in range(0, num_clusters):
-        base = cluster * PROCESSORS_IN_CLUSTER
-        # Створюємо зв'язки між процесорами в межах одного кластера
-        adjacency_matrix[base, base + 2] = 1  # 1-3 чорний
-        adjacency_matrix[base + 1, base + 2] = 1  # 2-3 чорний
-        adjacency_matrix[base + 2, base + 3] = 1  # 3-4 чорний
-        adjacency_matrix[base + 3, base + 4] = 1  # 4-5 чорний
-        adjacency_matrix[base + 3, base + 5] = 1  # 4-6 чорний
-
-        if cluster >= 1:
-            # Зв'язок між первинним кластером і вторинним кластером
-            adjacency_matrix[0, base] = 1  # Первинний 1 з вторинним 1 синій
-            adjacency_matrix[1, base + 1] = 1  # Первинний 2 з вторинним 2 світло-зелений
-            adjacency_matrix[2, base + 2] = 1  # Первинний 3 з вторинним 3 жовтий
-            adjacency_matrix[3, base + 3] = 1  # Первинний 4 з вторинним 4 бірюзовий
-            adjacency_matrix[4, base + 4] = 1  # Первинний 5 з вторинним 5 червоний
-            adjacency_matrix[5, base + 5] = 1  # Первинний 6 з вторинним 6 темно-зелений
-
-            # Створюємо нерегулярний зв'язок між вторинними кластерами
-            try:
-                adjacency_matrix[base, base + PROCESSORS_IN_CLUSTER + 1] = 1  # червоний пунктир
-            except IndexError:
-                if cluster >= 2:
-                    adjacency_matrix[base, PROCESSORS_IN_CLUSTER + 1] = 1
-
-        # Створюємо нерегулярні зв'язки між вторинними кластерами
-        if cluster >= 2:
-            try:
-                adjacency_matrix[base + 4, base + PROCESSORS_IN_CLUSTER + 4] = 1  # синій пунктир
-            except IndexError:
-                adjacency_matrix[base + 4, PROCESSORS_IN_CLUSTER + 4] = 1
-
-            if cluster % 2 == 0:
-                try:
-                    adjacency_matrix[base + 2, base + 2 * PROCESSORS_IN_CLUSTER + 2] = 1  # жовтий пунктир
-                except IndexError:
-                    if cluster != 2:
-                        adjacency_matrix[base + 2, 2 * PROCESSORS_IN_CLUSTER + 2] = 1
-
-                try:
-                    adjacency_matrix[base + 3, base - PROCESSORS_IN_CLUSTER + 2] = 1
-                    adjacency_matrix[base + 3, base + PROCESSORS_IN_CLUSTER + 2] = 1  # світло-зелений пунктир
-                except IndexError:
-                    adjacency_matrix[base + 3, PROCESSORS_IN_CLUSTER + 2] = 1
-
-            if cluster % 2 == 1:
-                try:
-                    adjacency_matrix[base + 3, base + 2 * PROCESSORS_IN_CLUSTER + 3] = 1  # бірюзовий пунктир
-                except IndexError:
-                    adjacency_matrix[base + 3, PROCESSORS_IN_CLUSTER + 3] = 1
-
-    # Робимо матрицю симетричною, оскільки зв’язки двосторонні
-    adjacency_matrix = adjacency_matrix + adjacency_matrix.T
-    return adjacency_matrix
-
-
-# Функція для обчислення топологічних характеристик
-def calculate_topological_properties(adjacency_matrix):
-    num_processors = adjacency_matrix.shape[0]
-    shortest_paths = floyd_warshall(adjacency_matrix, directed=False)
-    d = np.max(shortest_paths[shortest_paths != np.inf])
-    ad = np.sum(shortest_paths[shortest_paths != np.inf]) / (num_processors * (num_processors - 1))
-    s = np.max(np.sum(adjacency_matrix, axis=1))
-    c = np.sum(adjacency_matrix) // 2
-    t = (2 * ad) / s
+    total_distance = 128 * num_clusters ** 2 - 254 * num_clusters + 282 - 40 * odd
+    ad = total_distance / (num_processors * (num_processors - 1))
+    s = num_clusters + 2
 
     return {
         "Number of processors": num_processors,
-        "D": d,
+        "D": 5,
         "aD": ad,
         "S": s,
-        "C": c,
-        "T": t
+        "C": 15 * num_clusters - 13 + odd,
+        "T": (2 * ad) / s
     }
 
 
-def visualize_graph(adjacency_matrix, step):
-    graph = nx.Graph()
+# Характеристики за формулами, якщо вони діють для цієї кількості кластерів, інакше None.
+# topology.labs.formula_properties відповідає через цю функцію без побудови матриці.
+def closed_form_properties(num_clusters):
+    if num_clusters >= STAR_FORMULA_MIN_CLUSTERS:
+        return star_formulas(num_clusters)
+    return None
+
+
+# Характеристики зірки за O(1) для будь-якої кількості кластерів; для малих — звичайним обчисленням
+def star_properties(num_clusters):
+    properties = closed_form_properties(num_clusters)
+    if properties is not None:
+        return properties
+    return calculate_topological_properties(create_adjacency_matrix(num_clusters),
+                                            symmetries=cluster_symmetries(num_clusters))
+
+
+# Порівнює формули з обчисленими значеннями; повертає кількості кластерів, для яких вони розходяться
+def verify_star_formulas(cluster_counts):
+    mismatches = []
+    for num_clusters in cluster_counts:
+        expected = star_formulas(num_clusters)
+        computed = calculate_topological_properties(create_adjacency_matrix(num_clusters),
+                                                    symmetries=cluster_symmetries(num_clusters))
+        if any(not math.isclose(expected[key], computed[key]) for key in expected):
+            mismatches.append(num_clusters)
+    return mismatches
+
+
+def visualize_graph(adjacency_matrix, step, output_path=None, dpi=DEFAULT_DPI):
     num_processors = adjacency_matrix.shape[0]
     pos = {}
     cluster_offset = 10  # Зміщення для кожного нового кластера
 
-    # Додаємо вершини та зв'язки
-    for i in range(num_processors):
-        graph.add_node(i + 1)  # Іменуємо вузли 1, 2, ...
-    for i in range(num_processors):
-        for j in range(i + 1, num_processors):
-            if adjacency_matrix[i, j] == 1:
-                graph.add_edge(i + 1, j + 1)
-
     pos[1] = (0, 2)
     pos[2] = (2, 2)
     pos[3] = (1, 1)
@@ -124,6 +142,7 @@ def visualize_graph(adjacency_matrix, step):
             pos[base_index + 6] = (base_pos_x + 2, base_pos_y - 2)
 
     plt.figure(figsize=(12, 8))
+    groups = {}  # Зв'язки, згруповані за виглядом: одна LineCollection на групу
     cluster_labels = {}
     cluster_positions = []
 
@@ -145,14 +164,12 @@ def visualize_graph(adjacency_matrix, step):
             (base_index + 4, base_index + 5),
             (base_index + 4, base_index + 6),
         ]
-        nx.draw_networkx_edges(graph, pos, edgelist=internal_edges, edge_color="black", width=1)
+        add_edges(groups, internal_edges, "black", width=1)
 
     colors = ["blue", "lightgreen", "yellow", "cyan", "red", "darkgreen"]
     for i in range(6):
         edges = [(i + 1, i + 1 + j * 6) for j in range(1, num_processors // 6)]
-        nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color=colors[i], width=2,
-                               connectionstyle="arc3,rad=0.3",
-                               arrows=True)
+        add_edges(groups, edges, colors[i], width=2, rad=0.3)
 
     even_clusters = [cluster_num for cluster_num in range(1, num_processors // 6, 2)]
     odd_clusters = [cluster_num for cluster_num in range(2, num_processors // 6, 2)]
@@ -244,26 +261,22 @@ def visualize_graph(adjacency_matrix, step):
     if num_processors // 6 > 2:
         irregular_edges_red.append(((num_processors // 6 - 1) * 6 + 1, 8))
 
-    nx.draw_networkx_edges(graph, pos, edgelist=irregular_edges_blue, edge_color="blue", style="dashed", width=1.5,
-                           connectionstyle="arc3,rad=0.3", arrows=True)
+    add_edges(groups, irregular_edges_blue, "blue", width=1.5, style="dashed", rad=0.3)
 
-    nx.draw_networkx_edges(graph, pos, edgelist=irregular_edges_green, edge_color="lightgreen", style="dashed",
-                           width=1.5,
-                           connectionstyle="arc3,rad=0.3", arrows=True)
+    add_edges(groups, irregular_edges_green, "lightgreen", width=1.5, style="dashed", rad=0.3)
 
-    nx.draw_networkx_edges(graph, pos, edgelist=irregular_edges_yellow, edge_color="yellow", style="dashed", width=1.5,
-                           connectionstyle="arc3,rad=0.3", arrows=True)
+    add_edges(groups, irregular_edges_yellow, "yellow", width=1.5, style="dashed", rad=0.3)
 
-    nx.draw_networkx_edges(graph, pos, edgelist=irregular_edges_cyan, edge_color="cyan", style="dashed", width=1.5,
-                           connectionstyle="arc3,rad=0.3", arrows=True)
+    add_edges(groups, irregular_edges_cyan, "cyan", width=1.5, style="dashed", rad=0.3)
 
-    nx.draw_networkx_edges(graph, pos, edgelist=irregular_edges_red, edge_color="red", style="dashed", width=1.5,
-                           connectionstyle="arc3,rad=0.3", arrows=True)
+    add_edges(groups, irregular_edges_red, "red", width=1.5, style="dashed", rad=0.3)
 
-    nx.draw_networkx_nodes(graph, pos, node_size=200, node_color="skyblue")
-    nx.draw_networkx_labels(graph, pos, font_size=10, font_weight="bold")
+    ax = plt.gca()
+    positions = position_array(pos, num_processors)
+    draw_edge_groups(ax, positions, groups)
+    draw_nodes(ax, positions, node_size=200, node_color="skyblue", font_size=10)
     plt.title(f"Network Graph for Step {step}")
-    plt.show()
+    finish_figure(output_path, dpi)
 
 
 def main():
@@ -276,29 +289,36 @@ def main():
         return
 
     final_step = num_steps
-    final_adjacency_matrix = create_adjacency_matrix(final_step)
-    final_properties = calculate_topological_properties(final_adjacency_matrix)
+    with stage("build", clusters=final_step) as record:
+        final_adjacency_matrix = create_adjacency_matrix(final_step)
+        record.update(matrix_details(final_adjacency_matrix))
 
-    print("Матриця суміжності з нумерацією від 1 до n:")
-    print("    ", end="")  # Додатковий пробіл для вирівнювання
-    for j in range(1, final_adjacency_matrix.shape[1] + 1):
-        print(f"{j:2}", end=" ")
-    print()
+    with stage("metrics", clusters=final_step):
+        final_properties = star_properties(final_step)
 
-    for i in range(final_adjacency_matrix.shape[0]):
-        print(f"{i + 1:2}  ", end="")  # Нумерація рядків і відступ
-        for j in range(final_adjacency_matrix.shape[1]):
-            print(f"{final_adjacency_matrix[i, j]:2}", end=" ")
-        print()
+    with stage("matrix output", clusters=final_step):
+        print_adjacency_matrix(final_adjacency_matrix)
+        if EXPORT_PATH:
+            export_adjacency_matrix(final_adjacency_matrix, EXPORT_PATH)
+            print(f"Матрицю суміжності збережено у {EXPORT_PATH}")
 
-    visualize_graph(final_adjacency_matrix, final_step)
+    # Час цього етапу включає й час, поки відкрите вікно з графом
+    with stage("render", clusters=final_step):
+        visualize_graph(final_adjacency_matrix, final_step)
 
     print("\nРезультати масштабування:")
     print(f"Step {final_step}:")
     for prop, value in final_properties.items():
         print(f"  {prop}: {value}")
 
+    trace_path = write_trace()
+    if trace_path:
+        print(f"\nТрасування етапів збережено у {trace_path}")
+
 
+# from topology.sweep import scaling_sweep
+#
+#
 # def main():
 #     try:
 #         num_steps = int(input("Введіть кількість кластерів: "))  # Задаємо кількість кроків масштабування
@@ -310,12 +330,11 @@ def main():
 #
 #     results = []
 #
-#     for step in range(1, num_steps + 1):
+#     # Кожен крок додає один кластер і оновлює відстані попереднього кроку
+#     for step, adjacency_matrix, properties in scaling_sweep(create_adjacency_matrix, num_steps,
+#                                                             symmetries=cluster_symmetries):
 #         print(f"\n--- Крок {step} ---")
 #
-#         # Генеруємо матрицю суміжності для поточного етапу
-#         adjacency_matrix = create_adjacency_matrix(step)
-#         properties = calculate_topological_properties(adjacency_matrix)
 #         results.append({
 #             "Step": step,
 #             "Properties": properties
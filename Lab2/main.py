@@ -1,89 +1,63 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
-from scipy.sparse.csgraph import floyd_warshall
 import math
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology.export import export_adjacency_matrix, print_adjacency_matrix
+from topology.metrics import calculate_topological_properties
+from topology.profiling import matrix_details, stage, write_trace
+from topology.render import (DEFAULT_DPI, add_edges, draw_edge_groups, draw_nodes, finish_figure,
+                             position_array)
+from topology.rules import LinkRule, build_adjacency_matrix
+from topology.symmetry import cluster_rotation
+
 PROCESSORS_IN_CLUSTER = 7
 ADDITIONAL_ROTATION = -90  # Додатковий фіксований кут для повороту (в градусах)
+EXPORT_PATH = None  # Файл для збереження матриці суміжності (.txt, .mtx або .npz), None — не зберігати
+
+# Зв'язки між процесорами в межах одного кластера
+INTRA_CLUSTER_LINKS = [
+    (0, 1),  # 1-2 чорний
+    (1, 2),  # 2-3 чорний
+    (0, 3),  # 1-4 чорний
+    (1, 3),  # 2-4 чорний
+    (2, 3),  # 3-4 чорний
+    (3, 4),  # 4-5 чорний
+    (3, 5),  # 4-6 чорний
+    (3, 6),  # 4-7 чорний
+]
+
+
+def inter_cluster_links(num_clusters):
+    # Сусідні кластери за принципом n-n, останній замикається на перший
+    rules = [LinkRule(i, i, shift=1, wrap=0, wrap_skip=(0, 1)) for i in range(PROCESSORS_IN_CLUSTER)]
+
+    # Сині пунктирні зв'язки 2-2
+    if num_clusters != 3:
+        rules.append(LinkRule(1, 1, shift=2, period=2, residues=(0,), wrap=0, wrap_skip=(0, 2)))
+
+    rules += [
+        LinkRule(5, 5, shift=2, period=2, residues=(1,), wrap=1, wrap_skip=(1, 3)),  # Світло-зелені пунктирні 6-6
+        LinkRule(3, 4, shift=1, wrap=0, wrap_skip=(0, 1)),  # Жовті пунктирні 4-5
+        LinkRule(2, 0, shift=1, wrap=0, wrap_skip=(0, 1)),  # Бірюзові пунктирні 3-1
+    ]
+    return rules
+
 
 def create_adjacency_matrix(num_clusters):
-    num_processors = PROCESSORS_IN_CLUSTER * num_clusters
-    adjacency_matrix = np.zeros((num_processors, num_processors), dtype=int)
-
-    for cluster in range(0, num_clusters):
-        base = cluster * PROCESSORS_IN_CLUSTER
-        # Створюємо зв'язки між процесорами в межах одного кластера
-        adjacency_matrix[base, base + 1] = 1  # 1-2 чорний
-        adjacency_matrix[base + 1, base + 2] = 1  # 2-3 чорний
-        adjacency_matrix[base, base + 3] = 1  # 1-4 чорний
-        adjacency_matrix[base + 1, base + 3] = 1  # 2-4 чорний
-        adjacency_matrix[base + 2, base + 3] = 1  # 3-4 чорний
-        adjacency_matrix[base + 3, base + 4] = 1  # 4-5 чорний
-        adjacency_matrix[base + 3, base + 5] = 1  # 4-6 чорний
-        adjacency_matrix[base + 3, base + 6] = 1  # 4-7 чорний
-
-        # Сусідні кластери за принципом n-n
-        for i in range(0, 7):
-            try:
-                adjacency_matrix[base + i, base + PROCESSORS_IN_CLUSTER + i] = 1
-            except IndexError:
-                if cluster not in (0, 1):
-                    adjacency_matrix[base + i, i] = 1
-
-        # Сині пунктирні зв'язки 2-2
-        if cluster % 2 == 0 and num_clusters != 3:
-            try:
-                adjacency_matrix[base + 1, base + 2 * PROCESSORS_IN_CLUSTER + 1] = 1
-            except IndexError:
-                if cluster not in (0, 2):
-                    adjacency_matrix[base + 1, 1] = 1
-
-        # Світло-зелені пунктирні зв'зки 6-6
-        if cluster % 2 == 1:
-            try:
-                adjacency_matrix[base + 5, base + 2 * PROCESSORS_IN_CLUSTER + 5] = 1
-            except IndexError:
-                if cluster not in (1, 3):
-                    adjacency_matrix[base + 5, PROCESSORS_IN_CLUSTER + 5] = 1
-
-        # Жовті пунктирні 4-5
-        try:
-            adjacency_matrix[base + 3, base + PROCESSORS_IN_CLUSTER + 4] = 1
-        except IndexError:
-            if cluster not in (0, 1):
-                adjacency_matrix[base + 3, 4] = 1
-
-        # Бірюзові пунктирні 3-1
-        try:
-            adjacency_matrix[base + 2, base + PROCESSORS_IN_CLUSTER + 0] = 1
-        except IndexError:
-            if cluster not in (0, 1):
-                adjacency_matrix[base + 2, 0] = 1
-
-    # Робимо матрицю симетричною, оскільки зв’язки двосторонні
-    adjacency_matrix = adjacency_matrix + adjacency_matrix.T
-    return adjacency_matrix
-
-
-# Функція для обчислення топологічних характеристик
-def calculate_topological_properties(adjacency_matrix):
-    num_processors = adjacency_matrix.shape[0]
-    shortest_paths = floyd_warshall(adjacency_matrix, directed=False)
-    d = np.max(shortest_paths[shortest_paths != np.inf])
-    ad = np.sum(shortest_paths[shortest_paths != np.inf]) / (num_processors * (num_processors - 1))
-    s = np.max(np.sum(adjacency_matrix, axis=1))
-    c = np.sum(adjacency_matrix) // 2
-    t = (2 * ad) / s
-
-    return {
-        "Number of processors": num_processors,
-        "D": d,
-        "aD": ad,
-        "S": s,
-        "C": c,
-        "T": t
-    }
+    return build_adjacency_matrix(PROCESSORS_IN_CLUSTER, num_clusters, INTRA_CLUSTER_LINKS,
+                                  inter_cluster_links(num_clusters))
+
+
+# Кандидати в симетрії кільця: повороти на один і два кластери.
+# calculate_topological_properties залишає лише ті, що зберігають усі зв'язки.
+def cluster_symmetries(num_clusters):
+    return [cluster_rotation(num_clusters, PROCESSORS_IN_CLUSTER, shift) for shift in (1, 2)]
+
 
 # Поворот кластерів до центру графа
 def rotate_point(point, center, angle):
@@ -101,21 +75,12 @@ def calculate_angle_to_center(center):
     return angle
 
 
-def visualize_graph(adjacency_matrix, step):
-    graph = nx.Graph()
+def visualize_graph(adjacency_matrix, step, output_path=None, dpi=DEFAULT_DPI):
     num_processors = adjacency_matrix.shape[0]
     pos = {}
     cluster_offset = 10  # Зміщення для кожного нового кластера
     num_clusters = num_processors // PROCESSORS_IN_CLUSTER
 
-    # Додаємо вершини та зв'язки
-    for i in range(num_processors):
-        graph.add_node(i + 1)  # Іменуємо вузли 1, 2, ...
-    for i in range(num_processors):
-        for j in range(i + 1, num_processors):
-            if adjacency_matrix[i, j] == 1:
-                graph.add_edge(i + 1, j + 1)
-
     # Розміщуємо всі кластери рівномірно по колу
     angle_offset = 2 * np.pi / num_clusters
 
@@ -149,6 +114,7 @@ def visualize_graph(adjacency_matrix, step):
             pos[base_index + i + 1] = node_position
 
     plt.figure(figsize=(12, 8))
+    groups = {}  # Зв'язки, згруповані за виглядом: одна LineCollection на групу
     cluster_labels = {}
     cluster_positions = []
 
@@ -173,25 +139,21 @@ def visualize_graph(adjacency_matrix, step):
             (base_index + 4, base_index + 6),
             (base_index + 4, base_index + 7),
         ]
-        nx.draw_networkx_edges(graph, pos, edgelist=internal_edges, edge_color="black", width=1)
+        add_edges(groups, internal_edges, "black", width=1)
 
     colors = ["blue", "lightgreen", "yellow", "cyan", "red", "darkgreen", "pink"]
 
     if step < 3:
         for i in range(PROCESSORS_IN_CLUSTER):
             edges = [(i + 1, i + 1 + j * PROCESSORS_IN_CLUSTER) for j in range(1, num_clusters)]
-            nx.draw_networkx_edges(graph, pos, edgelist=edges, edge_color=colors[i], width=2,
-                                   connectionstyle="arc3,rad=0.3", arrows=True)
+            add_edges(groups, edges, colors[i], width=2, rad=0.3)
     else:
         for cluster_num in range(num_clusters):
             next_cluster = (cluster_num + 1) % num_clusters
             for i in range(PROCESSORS_IN_CLUSTER):
                 node_from = cluster_num * PROCESSORS_IN_CLUSTER + i + 1
                 node_to = next_cluster * PROCESSORS_IN_CLUSTER + i + 1
-                graph.add_edge(node_from, node_to)
-                nx.draw_networkx_edges(graph, pos, edgelist=[(node_from, node_to)],
-                                      edge_color=colors[i % len(colors)], width=2,
-                                      connectionstyle="arc3,rad=0.3", arrows=True)
+                add_edges(groups, [(node_from, node_to)], colors[i % len(colors)], width=2, rad=0.3)
 
     # Додаємо нерегулярні зв'язки
     blue_edges = []
@@ -230,15 +192,17 @@ def visualize_graph(adjacency_matrix, step):
         next_node = next_cluster * PROCESSORS_IN_CLUSTER + 1
         cyan_edges.append((current_node, next_node))
 
-    nx.draw_networkx_edges(graph, pos, edgelist=blue_edges, edge_color="blue", style="dashed", width=2)
-    nx.draw_networkx_edges(graph, pos, edgelist=green_edges, edge_color="lightgreen", style="dashed", width=2)
-    nx.draw_networkx_edges(graph, pos, edgelist=yellow_edges, edge_color="yellow", style="dashed", width=2)
-    nx.draw_networkx_edges(graph, pos, edgelist=cyan_edges, edge_color="cyan", style="dashed", width=2)
+    add_edges(groups, blue_edges, "blue", width=2, style="dashed")
+    add_edges(groups, green_edges, "lightgreen", width=2, style="dashed")
+    add_edges(groups, yellow_edges, "yellow", width=2, style="dashed")
+    add_edges(groups, cyan_edges, "cyan", width=2, style="dashed")
 
-    nx.draw_networkx_nodes(graph, pos, node_size=200, node_color="skyblue")
-    nx.draw_networkx_labels(graph, pos, font_size=10, font_weight="bold")
+    ax = plt.gca()
+    positions = position_array(pos, num_processors)
+    draw_edge_groups(ax, positions, groups)
+    draw_nodes(ax, positions, node_size=200, node_color="skyblue", font_size=10)
     plt.title(f"Network Graph for Step {step}")
-    plt.show()
+    finish_figure(output_path, dpi)
 
 
 def main():
@@ -251,29 +215,37 @@ def main():
         return
 
     final_step = num_steps
-    final_adjacency_matrix = create_adjacency_matrix(final_step)
-    final_properties = calculate_topological_properties(final_adjacency_matrix)
+    with stage("build", clusters=final_step) as record:
+        final_adjacency_matrix = create_adjacency_matrix(final_step)
+        record.update(matrix_details(final_adjacency_matrix))
 
-    print("Матриця суміжності з нумерацією від 1 до n:")
-    print("    ", end="")  # Додатковий пробіл для вирівнювання
-    for j in range(1, final_adjacency_matrix.shape[1] + 1):
-        print(f"{j:2}", end=" ")
-    print()
+    with stage("metrics", clusters=final_step):
+        final_properties = calculate_topological_properties(final_adjacency_matrix,
+                                                            symmetries=cluster_symmetries(final_step))
 
-    for i in range(final_adjacency_matrix.shape[0]):
-        print(f"{i + 1:2}  ", end="")  # Нумерація рядків і відступ
-        for j in range(final_adjacency_matrix.shape[1]):
-            print(f"{final_adjacency_matrix[i, j]:2}", end=" ")
-        print()
+    with stage("matrix output", clusters=final_step):
+        print_adjacency_matrix(final_adjacency_matrix)
+        if EXPORT_PATH:
+            export_adjacency_matrix(final_adjacency_matrix, EXPORT_PATH)
+            print(f"Матрицю суміжності збережено у {EXPORT_PATH}")
 
-    visualize_graph(final_adjacency_matrix, final_step)
+    # Час цього етапу включає й час, поки відкрите вікно з графом
+    with stage("render", clusters=final_step):
+        visualize_graph(final_adjacency_matrix, final_step)
 
     print("\nРезультати масштабування:")
     print(f"Step {final_step}:")
     for prop, value in final_properties.items():
         print(f"  {prop}: {value}")
 
+    trace_path = write_trace()
+    if trace_path:
+        print(f"\nТрасування етапів збережено у {trace_path}")
+
 
+# from topology.sweep import scaling_sweep
+#
+#
 # def main():
 #     try:
 #         num_steps = int(input("Введіть кількість кластерів: "))  # Задаємо кількість кроків масштабування
@@ -285,12 +257,11 @@ def main():
 #
 #     results = []
 #
-#     for step in range(1, num_steps + 1):
+#     # Кожен крок додає один кластер і оновлює відстані попереднього кроку
+#     for step, adjacency_matrix, properties in scaling_sweep(create_adjacency_matrix, num_steps,
+#                                                             symmetries=cluster_symmetries):
 #         print(f"\n--- Крок {step} ---")
 #
-#         # Генеруємо матрицю суміжності для поточного етапу
-#         adjacency_matrix = create_adjacency_matrix(step)
-#         properties = calculate_topological_properties(adjacency_matrix)
 #         results.append({
 #             "Step": step,
 #             "Properties": properties
@@ -1,125 +1,82 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
-import networkx as nx
-from scipy.sparse.csgraph import floyd_warshall
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology.export import export_adjacency_matrix, print_adjacency_matrix
+from topology.metrics import calculate_topological_properties
+from topology.profiling import matrix_details, stage, write_trace
+from topology.render import (DEFAULT_DPI, add_edges, draw_edge_groups, draw_nodes, finish_figure,
+                             position_array)
+from topology.rules import LinkRule, build_adjacency_matrix
+from topology.symmetry import cluster_reflection
 
 PROCESSORS_IN_CLUSTER = 9
+EXPORT_PATH = None  # Файл для збереження матриці суміжності (.txt, .mtx або .npz), None — не зберігати
+
+
+# Зв'язки між процесорами в межах одного кластера
+INTRA_CLUSTER_LINKS = [
+    (0, 1),  # 1-2 чорний
+    (0, 3),  # 1-4 чорний
+    (0, 4),  # 1-5 чорний
+    (1, 2),  # 2-3 чорний
+    (2, 4),  # 3-5 чорний
+    (2, 5),  # 3-6 чорний
+    (3, 6),  # 4-7 чорний
+    (4, 6),  # 5-7 чорний
+    (4, 8),  # 5-9 чорний
+    (5, 8),  # 6-9 чорний
+    (6, 7),  # 7-8 чорний
+    (7, 8),  # 8-9 чорний
+]
+
+
+def inter_cluster_links(num_clusters):
+    grid_size = int(np.ceil(np.sqrt(num_clusters)))  # Визначення розміру решітки
+    # Залишки номера кластера за модулем grid_size для всіх стовпців, крім останнього / першого
+    not_last_column = tuple(r for r in range(grid_size) if (r + 1) % grid_size != 0)
+    not_first_column = tuple(r for r in range(grid_size) if (r + 1) % grid_size != 1)
+
+    return [
+        # Правий сусід
+        LinkRule(2, 6, shift=1, period=grid_size, residues=not_last_column),  # Сині суцільні
+        LinkRule(8, 0, shift=1, period=grid_size, residues=not_last_column),  # Темно-зелені суцільні
+        LinkRule(5, 3, shift=1, period=grid_size, residues=not_last_column),  # Світло-зелені суцільні
+        # Правий нижній сусід
+        LinkRule(8, 0, shift=grid_size + 1, period=grid_size, residues=not_last_column),  # Сині пунктирні
+        # Лівий нижній сусід
+        LinkRule(6, 2, shift=grid_size - 1, period=grid_size, residues=not_first_column),  # Світло-зелені пунктирні
+        # Нижній сусід
+        LinkRule(7, 1, shift=grid_size),  # Бірюзові суцільні
+        LinkRule(6, 2, shift=grid_size),  # Жовті суцільні
+        LinkRule(8, 0, shift=grid_size),  # Червоні суцільні
+        LinkRule(3, 3, shift=grid_size),  # Жовті пунктирні
+        LinkRule(5, 5, shift=grid_size),  # Бірюзові пунктирні
+    ]
 
 
 def create_adjacency_matrix(num_clusters):
-    num_processors = PROCESSORS_IN_CLUSTER * num_clusters
-    adjacency_matrix = np.zeros((num_processors, num_processors), dtype=int)
-    grid_size = int(np.ceil(np.sqrt(num_clusters)))  # Визначення розміру решітки
+    return build_adjacency_matrix(PROCESSORS_IN_CLUSTER, num_clusters, INTRA_CLUSTER_LINKS,
+                                  inter_cluster_links(num_clusters))
 
-    for cluster in range(0, num_clusters):
-        base = cluster * PROCESSORS_IN_CLUSTER
-        # Створюємо зв'язки між процесорами в межах одного кластера
-        adjacency_matrix[base, base + 1] = 1  # 1-2 чорний
-        adjacency_matrix[base, base + 3] = 1  # 1-4 чорний
-        adjacency_matrix[base, base + 4] = 1  # 1-5 чорний
-        adjacency_matrix[base + 1, base + 2] = 1  # 2-3 чорний
-        adjacency_matrix[base + 2, base + 4] = 1  # 3-5 чорний
-        adjacency_matrix[base + 2, base + 5] = 1  # 3-6 чорний
-        adjacency_matrix[base + 3, base + 6] = 1  # 4-7 чорний
-        adjacency_matrix[base + 4, base + 6] = 1  # 5-7 чорний
-        adjacency_matrix[base + 4, base + 8] = 1  # 5-9 чорний
-        adjacency_matrix[base + 5, base + 8] = 1  # 6-9 чорний
-        adjacency_matrix[base + 6, base + 7] = 1  # 7-8 чорний
-        adjacency_matrix[base + 7, base + 8] = 1  # 8-9 чорний
-
-        if (cluster + 1) % grid_size != 0:
-            try:
-                adjacency_matrix[base + 2, base + PROCESSORS_IN_CLUSTER + 6] = 1  # Сині суцільні
-            except IndexError:
-                pass
-
-            try:
-                adjacency_matrix[base + 8, base + PROCESSORS_IN_CLUSTER] = 1  # Темно-зелені суцільні
-            except IndexError:
-                pass
-
-            try:
-                adjacency_matrix[base + 5, base + PROCESSORS_IN_CLUSTER + 3] = 1  # Світло-зелені суцільні
-            except IndexError:
-                pass
-
-            try:
-                adjacency_matrix[base + 8, base + (grid_size + 1) * PROCESSORS_IN_CLUSTER] = 1  # Сині пунктирні
-            except IndexError:
-                pass
-
-        if (cluster + 1) % grid_size != 1:
-            try:
-                adjacency_matrix[base + 6, base + (grid_size - 1) * PROCESSORS_IN_CLUSTER + 2] = 1  # Світло-зелені пунктирні
-            except IndexError:
-                pass
-
-        try:
-            adjacency_matrix[base + 7, base + grid_size * PROCESSORS_IN_CLUSTER + 1] = 1  # Бірюзові суцільні
-        except IndexError:
-            pass
-
-        try:
-            adjacency_matrix[base + 6, base + grid_size * PROCESSORS_IN_CLUSTER + 2] = 1  # Жовті суцільні
-        except IndexError:
-            pass
-
-        try:
-            adjacency_matrix[base + 8, base + grid_size * PROCESSORS_IN_CLUSTER] = 1  # Червоні суцільні
-        except IndexError:
-            pass
-
-        try:
-            adjacency_matrix[base + 3, base + grid_size * PROCESSORS_IN_CLUSTER + 3] = 1  # Жовті пунктирні
-        except IndexError:
-            pass
-
-        try:
-            adjacency_matrix[base + 5, base + grid_size * PROCESSORS_IN_CLUSTER + 5] = 1  # Бірюзові пунктирні
-        except IndexError:
-            pass
-
-    # Робимо матрицю симетричною, оскільки зв’язки двосторонні
-    adjacency_matrix = adjacency_matrix + adjacency_matrix.T
-    return adjacency_matrix
-
-
-# Функція для обчислення топологічних характеристик
-def calculate_topological_properties(adjacency_matrix):
-    num_processors = adjacency_matrix.shape[0]
-    shortest_paths = floyd_warshall(adjacency_matrix, directed=False)
-    d = np.max(shortest_paths[shortest_paths != np.inf])
-    ad = np.sum(shortest_paths[shortest_paths != np.inf]) / (num_processors * (num_processors - 1))
-    s = np.max(np.sum(adjacency_matrix, axis=1))
-    c = np.sum(adjacency_matrix) // 2
-    t = (2 * ad) / s
-
-    return {
-        "Number of processors": num_processors,
-        "D": d,
-        "aD": ad,
-        "S": s,
-        "C": c,
-        "T": t
-    }
-
-
-def visualize_graph(adjacency_matrix, step):
-    graph = nx.Graph()
+
+# Кандидат у симетрії решітки: поворот на 180° (зворотний порядок кластерів і процесорів).
+# calculate_topological_properties залишає його лише тоді, коли він зберігає всі зв'язки.
+def cluster_symmetries(num_clusters):
+    return [cluster_reflection(num_clusters, PROCESSORS_IN_CLUSTER)]
+
+
+def visualize_graph(adjacency_matrix, step, output_path=None, dpi=DEFAULT_DPI):
     num_processors = adjacency_matrix.shape[0]
     pos = {}
     num_clusters = num_processors // PROCESSORS_IN_CLUSTER
     grid_size = int(np.ceil(np.sqrt(num_clusters)))  # Визначення розміру решітки
     cluster_spacing = 10  # Відстань між кластерами в решітці
 
-    # Додаємо вершини та зв'язки
-    for i in range(num_processors):
-        graph.add_node(i + 1)  # Іменуємо вузли 1, 2, ...
-    for i in range(num_processors):
-        for j in range(i + 1, num_processors):
-            if adjacency_matrix[i, j] == 1:
-                graph.add_edge(i + 1, j + 1)
-
     # Розміщуємо всі кластери у вигляді решітки
     for cluster_num in range(num_clusters):
         row = cluster_num // grid_size
@@ -145,6 +102,7 @@ def visualize_graph(adjacency_matrix, step):
             pos[base_index + i + 1] = node_position
 
     plt.figure(figsize=(12, 8))
+    groups = {}  # Зв'язки, згруповані за виглядом: одна LineCollection на групу
     cluster_labels = {}
     cluster_positions = []
 
@@ -173,7 +131,7 @@ def visualize_graph(adjacency_matrix, step):
             (base_index + 7, base_index + 8),
             (base_index + 8, base_index + 9),
         ]
-        nx.draw_networkx_edges(graph, pos, edgelist=internal_edges, edge_color="black", width=1)
+        add_edges(groups, internal_edges, "black", width=1)
 
     # Додаємо нерегулярні зв'язки
     for cluster_num in range(num_clusters):
@@ -188,15 +146,15 @@ def visualize_graph(adjacency_matrix, step):
 
             # Сині зв'язки (3-7)
             blue_edges = [(current_base + 3, next_base + 7)]
-            nx.draw_networkx_edges(graph, pos, edgelist=blue_edges, edge_color="blue", width=2)
+            add_edges(groups, blue_edges, "blue", width=2)
 
             # Світло-зелені зв'язки (6-4)
             light_green_edges = [(current_base + 6, next_base + 4)]
-            nx.draw_networkx_edges(graph, pos, edgelist=light_green_edges, edge_color="lightgreen", width=2)
+            add_edges(groups, light_green_edges, "lightgreen", width=2)
 
             # Темно-зелені зв'язки (9-1)
             dark_green_edges = [(current_base + 9, next_base + 1)]
-            nx.draw_networkx_edges(graph, pos, edgelist=dark_green_edges, edge_color="darkgreen", width=2)
+            add_edges(groups, dark_green_edges, "darkgreen", width=2)
 
         # Визначаємо нижнього сусіда
         if row < grid_size - 1 and cluster_num + grid_size < num_clusters:
@@ -206,25 +164,23 @@ def visualize_graph(adjacency_matrix, step):
 
             # Жовті зв'язки (7-3)
             yellow_edges = [(current_base + 7, bottom_base + 3)]
-            nx.draw_networkx_edges(graph, pos, edgelist=yellow_edges, edge_color="yellow", width=2)
+            add_edges(groups, yellow_edges, "yellow", width=2)
 
             # Бірюзові зв'язки (8-2)
             turquoise_edges = [(current_base + 8, bottom_base + 2)]
-            nx.draw_networkx_edges(graph, pos, edgelist=turquoise_edges, edge_color="cyan", width=2)
+            add_edges(groups, turquoise_edges, "cyan", width=2)
 
             # Червоні зв'язки (9-1)
             red_edges = [(current_base + 9, bottom_base + 1)]
-            nx.draw_networkx_edges(graph, pos, edgelist=red_edges, edge_color="red", width=2)
+            add_edges(groups, red_edges, "red", width=2)
 
             # Жовті пунктирні зв'язки (4-4)
             yellow_dashed_edges = [(current_base + 4, bottom_base + 4)]
-            nx.draw_networkx_edges(graph, pos, edgelist=yellow_dashed_edges, edge_color="yellow", style="dashed",
-                                   width=2, connectionstyle="arc3,rad=0.2", arrows=True)
+            add_edges(groups, yellow_dashed_edges, "yellow", width=2, style="dashed", rad=0.2)
 
             # Бірюзові пунктирні зв'язки (6-6)
             turquoise_dashed_edges = [(current_base + 6, bottom_base + 6)]
-            nx.draw_networkx_edges(graph, pos, edgelist=turquoise_dashed_edges, edge_color="cyan", style="dashed",
-                                   width=2, connectionstyle="arc3,rad=-0.2", arrows=True)
+            add_edges(groups, turquoise_dashed_edges, "cyan", width=2, style="dashed", rad=-0.2)
 
         # Визначаємо правого нижнього сусіда (по діагоналі)
         if row < grid_size - 1 and col < grid_size - 1 and cluster_num + grid_size + 1 < num_clusters:
@@ -234,7 +190,7 @@ def visualize_graph(adjacency_matrix, step):
 
             # Сині пунктирні зв'язки (9-1)
             blue_dashed_edges = [(current_base + 9, diagonal_base + 1)]
-            nx.draw_networkx_edges(graph, pos, edgelist=blue_dashed_edges, edge_color="blue", style="dashed", width=2)
+            add_edges(groups, blue_dashed_edges, "blue", width=2, style="dashed")
 
         # Визначаємо лівого нижнього сусіда (по діагоналі)
         if row < grid_size - 1 and col > 0 and cluster_num + grid_size - 1 < num_clusters:
@@ -244,13 +200,14 @@ def visualize_graph(adjacency_matrix, step):
 
             # Світло-зелені пунктирні зв'язки (7-3)
             light_green_dashed_edges = [(current_base + 7, diagonal_base + 3)]
-            nx.draw_networkx_edges(graph, pos, edgelist=light_green_dashed_edges, edge_color="lightgreen",
-                                   style="dashed", width=2)
+            add_edges(groups, light_green_dashed_edges, "lightgreen", width=2, style="dashed")
 
-    nx.draw_networkx_nodes(graph, pos, node_size=200, node_color="skyblue")
-    nx.draw_networkx_labels(graph, pos, font_size=10, font_weight="bold")
+    ax = plt.gca()
+    positions = position_array(pos, num_processors)
+    draw_edge_groups(ax, positions, groups)
+    draw_nodes(ax, positions, node_size=200, node_color="skyblue", font_size=10)
     plt.title(f"Network Graph for Step {step}")
-    plt.show()
+    finish_figure(output_path, dpi)
 
 
 def main():
@@ -263,29 +220,37 @@ def main():
         return
 
     final_step = num_steps
-    final_adjacency_matrix = create_adjacency_matrix(final_step)
-    final_properties = calculate_topological_properties(final_adjacency_matrix)
+    with stage("build", clusters=final_step) as record:
+        final_adjacency_matrix = create_adjacency_matrix(final_step)
+        record.update(matrix_details(final_adjacency_matrix))
 
-    print("Матриця суміжності з нумерацією від 1 до n:")
-    print("    ", end="")  # Додатковий пробіл для вирівнювання
-    for j in range(1, final_adjacency_matrix.shape[1] + 1):
-        print(f"{j:2}", end=" ")
-    print()
+    with stage("metrics", clusters=final_step):
+        final_properties = calculate_topological_properties(final_adjacency_matrix,
+                                                            symmetries=cluster_symmetries(final_step))
 
-    for i in range(final_adjacency_matrix.shape[0]):
-        print(f"{i + 1:2}  ", end="")  # Нумерація рядків і відступ
-        for j in range(final_adjacency_matrix.shape[1]):
-            print(f"{final_adjacency_matrix[i, j]:2}", end=" ")
-        print()
+    with stage("matrix output", clusters=final_step):
+        print_adjacency_matrix(final_adjacency_matrix)
+        if EXPORT_PATH:
+            export_adjacency_matrix(final_adjacency_matrix, EXPORT_PATH)
+            print(f"Матрицю суміжності збережено у {EXPORT_PATH}")
 
-    visualize_graph(final_adjacency_matrix, final_step)
+    # Час цього етапу включає й час, поки відкрите вікно з графом
+    with stage("render", clusters=final_step):
+        visualize_graph(final_adjacency_matrix, final_step)
 
     print("\nРезультати масштабування:")
     print(f"Step {final_step}:")
     for prop, value in final_properties.items():
         print(f"  {prop}: {value}")
 
+    trace_path = write_trace()
+    if trace_path:
+        print(f"\nТрасування етапів збережено у {trace_path}")
 
+
+# from topology.sweep import scaling_sweep
+#
+#
 # def main():
 #     try:
 #         num_steps = int(input("Введіть кількість кластерів: "))  # Задаємо кількість кроків масштабування
@@ -297,12 +262,11 @@ def main():
 #
 #     results = []
 #
-#     for step in range(1, num_steps + 1):
+#     # Кожен крок додає один кластер і оновлює відстані попереднього кроку
+#     for step, adjacency_matrix, properties in scaling_sweep(create_adjacency_matrix, num_steps,
+#                                                             symmetries=cluster_symmetries):
 #         print(f"\n--- Крок {step} ---")
 #
-#         # Генеруємо матрицю суміжності для поточного етапу
-#         adjacency_matrix = create_adjacency_matrix(step)
-#         properties = calculate_topological_properties(adjacency_matrix)
 #         results.append({
 #             "Step": step,
 #             "Properties": properties
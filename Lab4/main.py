@@ -1,37 +1,42 @@
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
-data1 = {
-    "N": [6, 12, 18, 24, 30, 36, 42, 48, 54, 60, 66, 72, 78, 84, 90, 96, 102],
-    "D": [3, 4, 4, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5, 5],
-    "D_avg": [1.933, 2.303, 2.359, 2.496, 2.581, 2.734, 2.750, 2.855, 2.908, 2.977, 3.015, 3.064, 3.092, 3.128, 3.150, 3.178, 3.195],
-    "S": [3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19],
-    "C": [5, 16, 31, 46, 63, 77, 93, 107, 123, 137, 153, 167, 183, 197, 213, 227, 243],
-    "T": [1.288, 1.151, 0.943, 0.832, 0.737, 0.683, 0.611, 0.571, 0.528, 0.496, 0.463, 0.437, 0.412, 0.391, 0.370, 0.353, 0.336]
-}
-
-data2 = {
-    "N": [7, 14, 21, 28, 35, 42, 49, 56, 63, 70, 77, 84, 91, 98, 105],
-    "D": [2, 3, 3, 4, 4, 5, 5, 6, 6, 6, 7, 7, 7, 7, 8],
-    "D_avg": [1.619, 1.945, 2.028, 2.248, 2.457, 2.627, 2.839, 2.992, 3.195, 3.335, 3.525, 3.659, 3.838, 3.958, 4.134],
-    "S": [6, 8, 9, 9, 9, 9, 9, 9, 9, 9, 9, 9, 9, 9, 9],
-    "C": [8, 25, 51, 70, 88, 108, 125, 144, 161, 180, 197, 216, 233, 252, 269],
-    "T": [0.539, 0.486, 0.450, 0.499, 0.546, 0.583, 0.630, 0.664, 0.710, 0.741, 0.783, 0.813, 0.852, 0.879, 0.918]
-}
-
-data3 = {
-    "N": [9, 18, 27, 36, 45, 54, 63, 72, 81, 90, 99, 108],
-    "D": [3, 7, 7, 6, 8, 8, 9, 8, 8, 10, 10, 10],
-    "D_avg": [1.805, 2.856, 2.982, 2.936, 3.413, 3.498, 3.781, 3.711, 3.801, 4.299, 4.245, 4.356],
-    "S": [4, 4, 5, 6, 6, 6, 6, 6, 6, 6, 6, 6],
-    "C": [13, 27, 45, 66, 82, 103, 121, 143, 164, 180, 202, 223],
-    "T": [0.902, 1.428, 1.193, 0.978, 1.137, 1.166, 1.260, 1.237, 1.267, 1.433, 1.415, 1.452]
-}
-
-df1 = pd.DataFrame(data1)
-df2 = pd.DataFrame(data2)
-df3 = pd.DataFrame(data3)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from topology.labs import collect_properties
+
+# Діапазон кількості кластерів для порівняння та кількість процесів для пошуку відстаней
+CLUSTER_COUNTS = range(1, 18)
+WORKERS = None
+USE_CACHE = True  # Повторні запуски беруть характеристики з .topology_cache
+
+METRICS = ["D", "D_avg", "S", "C", "T"]
+
+
+def build_dataframe(topology):
+    records = collect_properties(topology, CLUSTER_COUNTS, workers=WORKERS, use_cache=USE_CACHE)
+    df = pd.DataFrame(records)
+    return df.rename(columns={"Number of processors": "N", "aD": "D_avg"})[["N"] + METRICS]
+
+
+# Сума нормалізованих характеристик (кожна ділиться на свій максимум серед усіх топологій),
+# усереднена в межах кожної зони — третини діапазону кількості кластерів
+def zone_scores(frames, zones=3):
+    maxima = pd.concat(frames)[METRICS].max()
+    scores = []
+    for df in frames:
+        normalized = (df[METRICS] / maxima).sum(axis=1).to_numpy()
+        scores.append([part.mean() for part in np.array_split(normalized, zones)])
+    return scores
+
+
+df1 = build_dataframe("star")
+df2 = build_dataframe("ring")
+df3 = build_dataframe("grid")
 
 plt.figure(figsize=(16, 10))
 
@@ -90,11 +95,7 @@ plt.show()
 
 # Data for the bar chart
 
-data1 = [5.729, 6.474, 7.505]  # First topology
-
-data2 = [6.418, 6.167, 6.443]   # Second topology
-
-data3 = [6.142, 5.87, 6.448]  # Third topology
+data1, data2, data3 = zone_scores([df1, df2, df3])  # Зірка, кільце, решітка
 
 
 
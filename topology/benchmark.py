@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+import numpy as np
+import scipy
+
+from topology.labs import TOPOLOGIES, load_lab
+from topology.metrics import calculate_topological_properties
+
+# Кількості кластерів, на яких вимірюються етапи
+CLUSTER_LADDER = [4, 16, 64, 256]
+# Рендеринг повільніший за інші етапи, тому для нього сходинки обмежені
+RENDER_MAX_CLUSTERS = 64
+STAGES = ["build", "metrics", "render"]
+REPEATS = 3
+# Регресія — коли час або пік пам'яті зросли більш ніж у THRESHOLD разів відносно базового запуску.
+# Зміни коротших за MIN_SECONDS вимірювань вважаються шумом.
+THRESHOLD = 1.25
+MIN_SECONDS = 0.01
+
+
+# Найкращий час із repeats запусків (без трасування), потім окремий запуск під tracemalloc для піку пам'яті
+def measure(function, repeats=REPEATS):
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return min(seconds), peak_bytes
+
+
+def benchmark_topology(topology, cluster_counts, stages=STAGES, repeats=REPEATS, workers=None,
+                       render_max_clusters=RENDER_MAX_CLUSTERS):
+    lab = load_lab(topology)
+    records = []
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for num_clusters in cluster_counts:
+            adjacency_matrix = lab.create_adjacency_matrix(num_clusters)
+            runs = {
+                "build": lambda: lab.create_adjacency_matrix(num_clusters),
+                "metrics": lambda: calculate_topological_properties(
+                    adjacency_matrix, workers=workers, symmetries=lab.cluster_symmetries(num_clusters)),
+                "render": lambda: lab.visualize_graph(adjacency_matrix, num_clusters,
+                                                      output_path=os.path.join(output_dir, "figure.png")),
+            }
+
+            for stage in stages:
+                if stage == "render" and num_clusters > render_max_clusters:
+                    continue
+                seconds, peak_bytes = measure(runs[stage], repeats)
+                records.append({
+                    "topology": topology,
+                    "clusters": num_clusters,
+                    "processors": adjacency_matrix.shape[0],
+                    "stage": stage,
+                    "seconds": seconds,
+                    "peak_bytes": peak_bytes,
+                })
+
+    return records
+
+
+def run_benchmarks(topologies=tuple(TOPOLOGIES), cluster_counts=CLUSTER_LADDER, stages=STAGES, repeats=REPEATS,
+                   workers=None, render_max_clusters=RENDER_MAX_CLUSTERS):
+    if "render" in stages:
+        matplotlib.use("Agg")
+
+    records = []
+    for topology in topologies:
+        records.extend(benchmark_topology(topology, cluster_counts, stages, repeats, workers, render_max_clusters))
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "cpus": os.cpu_count(),
+        "results": records,
+    }
+
+
+def _record_key(record):
+    return record["topology"], record["clusters"], record["stage"]
+
+
+# Порівнює з базовим запуском; повертає записи, де час або пам'ять погіршились понад поріг
+def find_regressions(report, baseline, threshold=THRESHOLD):
+    previous = {_record_key(record): record for record in baseline["results"]}
+    regressions = []
+
+    for record in report["results"]:
+        base = previous.get(_record_key(record))
+        if base is None:
+            continue
+        slower = (record["seconds"] > base["seconds"] * threshold
+                  and record["seconds"] - base["seconds"] > MIN_SECONDS)
+        heavier = record["peak_bytes"] > base["peak_bytes"] * threshold
+        if slower or heavier:
+            regressions.append({**record, "baseline_seconds": base["seconds"],
+                                "baseline_peak_bytes": base["peak_bytes"]})
+
+    return regressions
+
+
+def print_report(report, regressions=()):
+    flagged = {_record_key(record) for record in regressions}
+    print(f"{'Топологія':<10}{'Кластери':>10}{'Процесори':>11}  {'Етап':<8}{'Час, с':>11}{'Пік, МБ':>11}")
+    for record in report["results"]:
+        mark = "  <-- регресія" if _record_key(record) in flagged else ""
+        print(f"{record['topology']:<10}{record['clusters']:>10}{record['processors']:>11}  {record['stage']:<8}"
+              f"{record['seconds']:>11.4f}{record['peak_bytes'] / 2 ** 20:>11.2f}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m topology.benchmark",
+                                     description="Час і пік пам'яті побудови, метрик і рендерингу топологій")
+    parser.add_argument("--topologies", nargs="+", choices=list(TOPOLOGIES), default=list(TOPOLOGIES))
+    parser.add_argument("--clusters", nargs="+", type=int, default=CLUSTER_LADDER)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--render-max-clusters", type=int, default=RENDER_MAX_CLUSTERS)
+    parser.add_argument("--output", default="benchmark.json", help="куди записати результати (JSON)")
+    parser.add_argument("--baseline", default=None, help="попередній JSON для пошуку регресій")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.topologies, args.clusters, args.stages, args.repeats, args.workers,
+                            args.render_max_clusters)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = find_regressions(report, json.load(file), args.threshold)
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+    print_report(report, regressions)
+    print(f"\nРезультати збережено у {args.output}")
+    if regressions:
+        print(f"Знайдено регресій: {len(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Скільки джерел обробляється одночасно: по одному біту на джерело в кожному 64-бітному слові
+WORD_BITS = 64
+DEFAULT_WORDS = 4
+
+
+# Розбиває номери джерел у блоці на номер слова та маску біта
+def _source_bits(count):
+    positions = np.arange(count)
+    return positions // WORD_BITS, np.left_shift(np.uint64(1), (positions % WORD_BITS).astype(np.uint64))
+
+
+# Кількість одиничних бітів у кожній позиції по всіх процесорах (тобто по кожному джерелу)
+def _bit_counts(bitsets, count):
+    bits = np.unpackbits(bitsets.view(np.uint8), axis=1, bitorder="little")
+    return bits[:, :count].sum(axis=0, dtype=np.int64)
+
+
+# Частка процесорів у фронті, з якої вигідніше пройти всі списки сусідів підряд
+DENSE_FRONTIER = 0.125
+
+
+# Один крок пошуку: побітове АБО фронтів усіх сусідів для кожного процесора, якого досяг фронт.
+# Зв'язки двосторонні, тож сусіди активного процесора — це рядок CSR-матриці.
+def _expand(pattern, degrees, active, frontier):
+    if active.size > DENSE_FRONTIER * pattern.shape[0]:
+        return _expand_dense(pattern, degrees, active, frontier)
+    counts = degrees[active]
+    total = counts.sum()
+    if total == 0:
+        return active[:0], frontier[:0]
+    first_edge = np.repeat(pattern.indptr[active] - np.cumsum(counts) + counts, counts)
+    targets = pattern.indices[first_edge + np.arange(total)]
+    values = frontier[np.repeat(np.arange(active.size), counts)]
+
+    order = np.argsort(targets, kind="stable")
+    targets, values = targets[order], values[order]
+    starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+    return targets[starts], np.bitwise_or.reduceat(values, starts, axis=0)
+
+
+# Широкий фронт: АБО по кожному списку сусідів усієї матриці без сортування
+def _expand_dense(pattern, degrees, active, frontier):
+    full = np.zeros((pattern.shape[0], frontier.shape[1]), dtype=frontier.dtype)
+    full[active] = frontier
+    # Порожні рядки не беруть участі в reduceat: він повернув би для них чужий елемент
+    connected = np.flatnonzero(degrees)
+    return connected, np.bitwise_or.reduceat(full[pattern.indices], pattern.indptr[:-1][connected], axis=0)
+
+
+# Те саме, що distances.source_statistics, але фронти пошуку зберігаються як упаковані бітові
+# множини: за один прохід по списках сусідів рівень просувається одразу для 64 * words джерел.
+# pattern — матриця, отримана з link_pattern.
+def bitset_source_statistics(pattern, sources, words=DEFAULT_WORDS):
+    num_processors = pattern.shape[0]
+    sources = np.asarray(sources, dtype=np.int64)
+    degrees = np.diff(pattern.indptr)
+    eccentricity = np.zeros(sources.size, dtype=np.int64)
+    row_sums = np.zeros(sources.size, dtype=np.int64)
+    block_size = WORD_BITS * words
+
+    for start in range(0, sources.size, block_size):
+        block = sources[start:start + block_size]
+        word_index, masks = _source_bits(block.size)
+        visited = np.zeros((num_processors, words), dtype="<u8")
+        np.bitwise_or.at(visited, (block, word_index), masks)
+        active = np.unique(block)
+        frontier = visited[active]
+        level = 0
+
+        while active.size:
+            level += 1
+            active, reached = _expand(pattern, degrees, active, frontier)
+            frontier = reached & ~visited[active]
+            fresh = frontier.any(axis=1)
+            active, frontier = active[fresh], frontier[fresh]
+            if active.size == 0:
+                break
+            visited[active] |= frontier
+            counts = _bit_counts(frontier, block.size)
+            row_sums[start:start + block.size] += level * counts
+            eccentricity[start:start + block.size][counts > 0] = level
+
+    return eccentricity, row_sums
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+
+from scipy import sparse
+
+from topology.metrics import calculate_topological_properties
+
+CACHE_DIR = os.environ.get("TOPOLOGY_CACHE_DIR",
+                           os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                        ".topology_cache"))
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+# Змінюється разом зі способом обчислення характеристик, щоб старі записи не використовувались
+CACHE_VERSION = 2
+
+
+# Ключ запису: хеш назви топології, кількості кластерів і самих правил побудови з модуля lab.
+# Зміна будь-якого правила в лабораторній дає новий ключ, тож застарілі результати не читаються.
+def cache_key(topology, lab, num_clusters):
+    description = {
+        "version": CACHE_VERSION,
+        "topology": topology,
+        "num_clusters": num_clusters,
+        "cluster_size": lab.PROCESSORS_IN_CLUSTER,
+        "intra": [list(link) for link in lab.INTRA_CLUSTER_LINKS],
+        "inter": [list(rule) for rule in lab.inter_cluster_links(num_clusters)],
+    }
+    encoded = json.dumps(description, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _entry_paths(cache_dir, key):
+    return os.path.join(cache_dir, key + ".json"), os.path.join(cache_dir, key + ".npz")
+
+
+# Звільняє місце, видаляючи записи, які найдовше не використовувались
+def evict(cache_dir, max_bytes):
+    entries = {}
+    for name in os.listdir(cache_dir):
+        key, extension = os.path.splitext(name)
+        if extension not in (".json", ".npz"):
+            continue
+        stat = os.stat(os.path.join(cache_dir, name))
+        size, used = entries.get(key, (0, 0))
+        entries[key] = (size + stat.st_size, max(used, stat.st_mtime))
+
+    total = sum(size for size, _ in entries.values())
+    for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+        if total <= max_bytes:
+            break
+        for path in _entry_paths(cache_dir, key):
+            if os.path.exists(path):
+                os.remove(path)
+        total -= size
+
+
+def read_properties(topology, lab, num_clusters, cache_dir=CACHE_DIR):
+    metrics_path, _ = _entry_paths(cache_dir, cache_key(topology, lab, num_clusters))
+    if not os.path.exists(metrics_path):
+        return None
+    os.utime(metrics_path)  # Позначаємо запис як щойно використаний
+    with open(metrics_path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def read_adjacency_matrix(topology, lab, num_clusters, cache_dir=CACHE_DIR):
+    _, matrix_path = _entry_paths(cache_dir, cache_key(topology, lab, num_clusters))
+    if not os.path.exists(matrix_path):
+        return None
+    os.utime(matrix_path)
+    return sparse.load_npz(matrix_path)
+
+
+def write_entry(topology, lab, num_clusters, properties, adjacency_matrix=None, cache_dir=CACHE_DIR,
+                max_bytes=MAX_CACHE_BYTES):
+    os.makedirs(cache_dir, exist_ok=True)
+    metrics_path, matrix_path = _entry_paths(cache_dir, cache_key(topology, lab, num_clusters))
+
+    # Спершу пишемо тимчасовий файл, щоб паралельні запуски не прочитали запис наполовину
+    temporary_path = metrics_path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as file:
+        json.dump(properties, file)
+    os.replace(temporary_path, metrics_path)
+    if adjacency_matrix is not None:
+        sparse.save_npz(matrix_path, sparse.csr_matrix(adjacency_matrix))
+
+    evict(cache_dir, max_bytes)
+
+
+# Характеристики з кешу; за відсутності запису — обчислення і збереження результату.
+# adjacency_matrix — уже побудована матриця цієї топології, щоб не будувати її вдруге.
+def cached_properties(topology, lab, num_clusters, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES,
+                      store_matrix=False, workers=None, adjacency_matrix=None):
+    properties = read_properties(topology, lab, num_clusters, cache_dir)
+    if properties is not None:
+        return properties
+
+    if adjacency_matrix is None:
+        adjacency_matrix = lab.create_adjacency_matrix(num_clusters)
+    properties = calculate_topological_properties(adjacency_matrix, workers=workers,
+                                                  symmetries=lab.cluster_symmetries(num_clusters))
+    write_entry(topology, lab, num_clusters, properties, adjacency_matrix if store_matrix else None,
+                cache_dir, max_bytes)
+    return properties
@@ -0,0 +1,128 @@
+import argparse
+import contextlib
+import csv
+import json
+import sys
+
+from topology.cache import cached_properties
+from topology.export import print_adjacency_matrix
+from topology.labs import TOPOLOGIES, formula_properties, load_lab, render_steps
+from topology.metrics import calculate_topological_properties
+from topology.profiling import enable_tracing, matrix_details, stage, write_trace
+from topology.render import DEFAULT_DPI
+
+FIELDS = ["Topology", "Clusters", "Number of processors", "D", "aD", "S", "C", "T"]
+
+
+# "1-100", "1-100:5", "3,5,7" і їх поєднання через кому -> відсортований список без повторів
+def parse_cluster_range(text):
+    counts = set()
+    for part in text.split(","):
+        part = part.strip()
+        span, _, step = part.partition(":")
+        first, _, last = span.partition("-")
+        try:
+            first = int(first)
+            last = int(last) if last else first
+            step = int(step) if step else 1
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Неправильний діапазон кластерів: {part}")
+        if first < 1 or last < first or step < 1:
+            raise argparse.ArgumentTypeError(f"Неправильний діапазон кластерів: {part}")
+        counts.update(range(first, last + 1, step))
+    return sorted(counts)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m topology",
+                                     description="Характеристики топологій для діапазону кількості кластерів")
+    parser.add_argument("--topology", nargs="+", choices=list(TOPOLOGIES), default=list(TOPOLOGIES))
+    parser.add_argument("--clusters", type=parse_cluster_range, default=parse_cluster_range("1-10"),
+                        help='кількості кластерів: "1-100", "1-100:5", "3,5,7" (типово 1-10)')
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", default="-", help="файл результатів (типово stdout)")
+    parser.add_argument("--no-plot", action="store_true", help="не рендерити графи")
+    parser.add_argument("--plot-dir", default="figures", help="каталог для рисунків (без дисплея)")
+    parser.add_argument("--plot-format", default="png")
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--no-matrix", action="store_true", help="не друкувати матрицю суміжності (у stderr)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="процеси для метрик і рендерингу (0 — усі ядра, типово 1)")
+    parser.add_argument("--cache", action="store_true", help="брати й зберігати результати в topology.cache")
+    parser.add_argument("--trace", default=None, help="JSON-трасування етапів")
+    parser.add_argument("--profile", default=None, help="дамп cProfile (разом з --trace)")
+    return parser
+
+
+# Формули (де вони є) і кеш відповідають без побудови матриці, якщо її не треба друкувати
+def compute_properties(topology, lab, num_clusters, args):
+    formulas = formula_properties(lab, num_clusters)
+    if args.no_matrix and (formulas is not None or args.cache):
+        with stage("metrics", topology=topology, clusters=num_clusters):
+            if formulas is not None:
+                return formulas
+            return cached_properties(topology, lab, num_clusters, workers=args.workers)
+
+    with stage("build", topology=topology, clusters=num_clusters) as record:
+        adjacency_matrix = lab.create_adjacency_matrix(num_clusters)
+        record.update(matrix_details(adjacency_matrix))
+
+    if not args.no_matrix:
+        with stage("matrix output", topology=topology, clusters=num_clusters):
+            with contextlib.redirect_stdout(sys.stderr):
+                print(f"{topology}, кластерів: {num_clusters}")
+                print_adjacency_matrix(adjacency_matrix)
+
+    with stage("metrics", topology=topology, clusters=num_clusters):
+        if formulas is not None:
+            return formulas
+        if args.cache:
+            return cached_properties(topology, lab, num_clusters, workers=args.workers,
+                                     adjacency_matrix=adjacency_matrix)
+        return calculate_topological_properties(adjacency_matrix, workers=args.workers,
+                                                symmetries=lab.cluster_symmetries(num_clusters))
+
+
+# Записи для кожної топології та кількості кластерів; CSV пишеться рядок за рядком
+def run(args, output):
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    records = []
+
+    for topology in args.topology:
+        lab = load_lab(topology)
+        for num_clusters in args.clusters:
+            properties = compute_properties(topology, lab, num_clusters, args)
+            record = {"Topology": topology, "Clusters": num_clusters, **properties}
+            if writer is None:
+                records.append(record)
+            else:
+                writer.writerow(record)
+
+        if not args.no_plot:
+            with stage("render", topology=topology, steps=len(args.clusters)):
+                render_steps(topology, args.clusters, args.plot_dir, args.plot_format, args.dpi, args.workers)
+
+    if writer is None:
+        json.dump(records, output, indent=2, ensure_ascii=False)
+        output.write("\n")
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile and not args.trace:
+        parser.error("--profile працює лише разом з --trace")
+    if args.trace:
+        enable_tracing(args.trace, args.profile)
+
+    if args.output == "-":
+        run(args, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8", newline="") as output:
+            run(args, output)
+
+    write_trace()
+    return 0
@@ -0,0 +1,161 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import breadth_first_order, connected_components, maximum_flow
+
+from topology.sparse import link_pattern
+from topology.symmetry import orbit_labels, verified_symmetries
+
+
+# Мережа потоку з додатковою вершиною-джерелом (останньою), яка має дуги нульової ємності до всіх вершин.
+# Для потоку з source ємність дуги до source стає рівною cap: потік не перевищує cap, тож пошук
+# завершується, щойно стає ясно, що розріз не менший за поточний. Мережа будується один раз.
+def flow_network(rows, cols, capacities, num_nodes):
+    super_source = num_nodes
+    nodes = np.arange(num_nodes)
+    network = sparse.csr_matrix((np.concatenate([capacities, np.zeros(num_nodes)]).astype(np.int32),
+                                 (np.concatenate([rows, np.full(num_nodes, super_source)]),
+                                  np.concatenate([cols, nodes]))),
+                                shape=(num_nodes + 1, num_nodes + 1))
+    network.sum_duplicates()
+    return network
+
+
+def _capped_flow(network, source, sink, cap):
+    entry = network.indptr[-2] + source  # Рядок додаткового джерела містить усі вершини по порядку
+    network.data[entry] = cap
+    result = maximum_flow(network, network.shape[0] - 1, sink)
+    side = _source_side(network, result) if result.flow_value < cap else None
+    network.data[entry] = 0
+    return result.flow_value, side
+
+
+# Вершини, досяжні з додаткового джерела в залишковій мережі: вони задають мінімальний розріз
+def _source_side(network, result):
+    residual = (network - result.flow).tocsr()
+    residual.data[residual.data < 0] = 0
+    residual.eliminate_zeros()
+    reached = breadth_first_order(residual, network.shape[0] - 1, directed=True, return_predecessors=False)
+    side = np.zeros(network.shape[0], dtype=bool)
+    side[reached] = True
+    return side[:-1]
+
+
+# Опорний процесор: найменшого степеня, серед них — нерухомий для найбільшої кількості симетрій
+def _pivot(degrees, symmetries):
+    candidates = np.flatnonzero(degrees == degrees.min())
+    fixed = [sum(int(permutation[v] == v) for permutation in symmetries) for v in candidates]
+    return int(candidates[int(np.argmax(fixed))])
+
+
+# Цілі для потоків із pivot: по одній з кожної орбіти симетрій, що залишають pivot на місці
+# (потік з pivot до u і до образу u однаковий)
+def _prune_targets(num_processors, targets, pivot, symmetries):
+    stabilizer = [permutation for permutation in symmetries if permutation[pivot] == pivot]
+    if not stabilizer or len(targets) == 0:
+        return np.asarray(targets, dtype=np.int64)
+    labels = orbit_labels(num_processors, stabilizer)
+    _, first = np.unique(labels[targets], return_index=True)
+    return np.asarray(targets, dtype=np.int64)[np.sort(first)]
+
+
+# Жадібна домінуюча множина, що містить pivot: кожен процесор у ній або сусідній з нею
+def dominating_set(pattern, pivot):
+    covered = np.zeros(pattern.shape[0], dtype=bool)
+    members = []
+    for v in [pivot] + list(np.argsort(-np.diff(pattern.indptr), kind="stable")):
+        if not covered[v]:
+            members.append(int(v))
+            covered[v] = True
+            covered[pattern.indices[pattern.indptr[v]:pattern.indptr[v + 1]]] = True
+    return np.array(members, dtype=np.int64)
+
+
+def _prepare(adjacency_matrix, symmetries):
+    pattern = link_pattern(adjacency_matrix)
+    symmetries = verified_symmetries(pattern, symmetries or [])
+    return pattern, [np.asarray(permutation) for permutation in symmetries]
+
+
+# Реберна зв'язність і мінімальний розріз (масив пар процесорів від 0).
+# Есфаганян–Хакімі: якщо зв'язність менша за мінімальний степінь, то обидві частини мінімального розрізу
+# містять процесори будь-якої домінуючої множини, тому досить потоків від pivot до решти її процесорів.
+def edge_connectivity(adjacency_matrix, symmetries=None):
+    pattern, symmetries = _prepare(adjacency_matrix, symmetries)
+    num_processors = pattern.shape[0]
+    if num_processors < 2 or connected_components(pattern, directed=False)[0] > 1:
+        return 0, np.empty((0, 2), dtype=np.int64)
+
+    degrees = np.diff(pattern.indptr)
+    pivot = _pivot(degrees, symmetries)
+    coo = pattern.tocoo()
+    rows, cols = coo.row.astype(np.int64), coo.col.astype(np.int64)
+    best = int(degrees[pivot])
+    cut = np.column_stack([np.full(best, pivot), pattern.indices[pattern.indptr[pivot]:pattern.indptr[pivot + 1]]])
+
+    network = flow_network(rows, cols, np.ones(rows.size), num_processors)
+    targets = _prune_targets(num_processors, dominating_set(pattern, pivot)[1:], pivot, symmetries)
+    for target in targets:
+        if best == 1:  # Менше для зв'язного графа не буває
+            break
+        value, side = _capped_flow(network, pivot, target, best)
+        if value < best:
+            best = int(value)
+            crossing = side[rows] & ~side[cols]
+            cut = np.column_stack([rows[crossing], cols[crossing]])
+
+    return best, cut
+
+
+# Вершинна зв'язність і мінімальний розділяючий набір процесорів (від 0).
+# Потоки рахуються в розщепленій мережі Евена: процесор v — це дуга v_in -> v_out ємності 1,
+# зв'язок u-w — дуги u_out -> w_in і w_out -> u_in необмеженої ємності. За Есфаганяном–Хакімі досить
+# пар (pivot, w) для w поза околом pivot і пар несуміжних сусідів pivot.
+def vertex_connectivity(adjacency_matrix, symmetries=None):
+    pattern, symmetries = _prepare(adjacency_matrix, symmetries)
+    num_processors = pattern.shape[0]
+    if num_processors < 2 or connected_components(pattern, directed=False)[0] > 1:
+        return 0, np.empty(0, dtype=np.int64)
+    if pattern.nnz == num_processors * (num_processors - 1):  # Повний граф не розділяється
+        return num_processors - 1, np.arange(1, num_processors)
+
+    degrees = np.diff(pattern.indptr)
+    pivot = _pivot(degrees, symmetries)
+    neighbours = pattern.indices[pattern.indptr[pivot]:pattern.indptr[pivot + 1]].astype(np.int64)
+    best, cut = int(degrees[pivot]), neighbours
+
+    coo = pattern.tocoo()
+    processors = np.arange(num_processors)
+    rows = np.concatenate([processors, coo.row + num_processors])
+    cols = np.concatenate([processors + num_processors, coo.col])
+    capacities = np.concatenate([np.ones(num_processors), np.full(coo.nnz, num_processors)])
+
+    outside = np.ones(num_processors, dtype=bool)
+    outside[neighbours] = False
+    outside[pivot] = False
+    pairs = [(pivot, int(target)) for target in
+             _prune_targets(num_processors, np.flatnonzero(outside), pivot, symmetries)]
+    dense_neighbours = pattern[neighbours][:, neighbours].toarray()
+    pairs += [(int(neighbours[i]), int(neighbours[j])) for i in range(neighbours.size)
+              for j in range(i + 1, neighbours.size) if not dense_neighbours[i, j]]
+
+    network = flow_network(rows, cols, capacities, 2 * num_processors)
+    for source, target in pairs:
+        if best == 1:
+            break
+        value, side = _capped_flow(network, source + num_processors, target, best)
+        if value < best:
+            best = int(value)
+            cut = np.flatnonzero(side[:num_processors] & ~side[num_processors:])
+
+    return best, cut
+
+
+def connectivity_properties(adjacency_matrix, symmetries=None):
+    edges, edge_cut = edge_connectivity(adjacency_matrix, symmetries)
+    vertices, vertex_cut = vertex_connectivity(adjacency_matrix, symmetries)
+    return {
+        "Edge connectivity": edges,
+        "Vertex connectivity": vertices,
+        "Min edge cut": edge_cut.tolist(),
+        "Min vertex cut": vertex_cut.tolist(),
+    }
@@ -0,0 +1,68 @@
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from topology.distances import default_block_size, hop_distance_rows
+from topology.sparse import link_pattern
+
+# Скільки джерел пошуку обирається в першому раунді; далі кількість подвоюється, тож на
+# «незручних» топологіях (кільце, де ексцентриситети майже однакові) пошук швидко
+# переходить до великих блоків, а не тисяч окремих проходів
+DIAMETER_BATCH = 4
+
+
+# Точний діаметр зв'язної мережі за межами ексцентриситетів (BoundingDiameters, Takes & Kosters).
+# Кожен пошук із процесора w з ексцентриситетом e дає для всіх v:
+#   max(d(v, w), e - d(v, w)) <= ecc(v) <= e + d(v, w).
+# Процесори, чия верхня межа не перевищує знайденої нижньої межі діаметра, відкидаються.
+# Джерела обираються почергово з найбільшою верхньою і найменшою нижньою межею —
+# так уже перші пошуки повторюють подвійний прохід (double sweep).
+def _connected_diameter(pattern):
+    num_processors = pattern.shape[0]
+    degrees = np.diff(pattern.indptr)
+    lower = np.zeros(num_processors, dtype=np.int64)
+    upper = np.full(num_processors, np.iinfo(np.int64).max, dtype=np.int64)
+    candidates = np.ones(num_processors, dtype=bool)
+    diameter_lower, diameter_upper = 0, np.iinfo(np.int64).max
+    pick_high = True
+    batch_size = DIAMETER_BATCH
+
+    while diameter_upper > diameter_lower and candidates.any():
+        remaining = np.flatnonzero(candidates)
+        sources = []
+        while remaining.size and len(sources) < batch_size:
+            if pick_high:
+                order = np.lexsort((-degrees[remaining], -upper[remaining]))
+            else:
+                order = np.lexsort((-degrees[remaining], lower[remaining]))
+            sources.append(remaining[order[0]])
+            remaining = np.delete(remaining, order[0])
+            pick_high = not pick_high
+
+        for source, distances in zip(sources, hop_distance_rows(pattern, sources).astype(np.int64)):
+            eccentricity = int(distances.max())
+            np.maximum(lower, np.maximum(distances, eccentricity - distances), out=lower)
+            np.minimum(upper, eccentricity + distances, out=upper)
+            lower[source] = upper[source] = eccentricity
+            diameter_lower = max(diameter_lower, eccentricity)
+            diameter_upper = min(diameter_upper, 2 * eccentricity)
+
+        diameter_upper = min(diameter_upper, int(upper.max()))
+        candidates &= (upper > diameter_lower) & (lower < upper)
+        batch_size = min(2 * batch_size, default_block_size(num_processors))
+
+    return diameter_lower
+
+
+# Діаметр D без пошуку з усіх процесорів; для незв'язної мережі — найбільший серед компонент,
+# як і в calculate_topological_properties
+def exact_diameter(adjacency_matrix):
+    pattern = link_pattern(adjacency_matrix)
+    _, labels = connected_components(pattern, directed=False)
+    diameter = 0
+
+    for component in np.unique(labels):
+        members = np.flatnonzero(labels == component)
+        if members.size > 1:
+            diameter = max(diameter, _connected_diameter(pattern[members][:, members]))
+
+    return diameter
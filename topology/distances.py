@@ -0,0 +1,173 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from topology.bitset import bitset_source_statistics
+from topology.sparse import link_pattern
+
+# Скільки комірок (джерела x процесори) дозволено тримати в масиві відвіданих вершин
+BLOCK_CELLS = 1 << 25
+# До цієї кількості процесорів фронт просувається щільним добутком (BLAS) — накладні витрати
+# розріджених добутків на кожному рівні для малих графів більші за саму роботу
+DENSE_BFS_LIMIT = 256
+
+
+def default_block_size(num_processors):
+    return max(1, min(num_processors, BLOCK_CELLS // max(num_processors, 1)))
+
+
+# Пошук у ширину одночасно з кількох джерел по CSR-матриці.
+# На кожному рівні повертає пари (номер джерела в блоці, процесор), відкриті на цій відстані.
+def bfs_levels(pattern, sources):
+    num_processors = pattern.shape[0]
+    sources = np.asarray(sources, dtype=np.int64)
+    if num_processors <= DENSE_BFS_LIMIT:
+        yield from dense_bfs_levels(pattern, sources)
+        return
+    block = np.arange(sources.size)
+    visited = np.zeros((sources.size, num_processors), dtype=bool)
+    visited[block, sources] = True
+    frontier = sparse.csr_matrix((np.ones(sources.size, dtype=np.int32), (block, sources)),
+                                 shape=(sources.size, num_processors))
+    level = 0
+
+    while frontier.nnz:
+        level += 1
+        reached = (frontier @ pattern).tocoo()
+        fresh = ~visited[reached.row, reached.col]
+        rows, cols = reached.row[fresh], reached.col[fresh]
+        if rows.size == 0:
+            break
+        visited[rows, cols] = True
+        yield level, rows, cols
+        # Добуток CSR-матриць упорядкований за рядками, тож новий фронт збирається без сортування
+        indptr = np.zeros(sources.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=sources.size), out=indptr[1:])
+        frontier = sparse.csr_matrix((np.ones(rows.size, dtype=np.int32), cols, indptr),
+                                     shape=(sources.size, num_processors))
+
+
+# Те саме для малих графів: фронт — щільна булева матриця, сусіди — її добуток на матрицю суміжності
+def dense_bfs_levels(pattern, sources):
+    adjacency = pattern.toarray().astype(np.float32)
+    visited = np.zeros((sources.size, pattern.shape[0]), dtype=bool)
+    visited[np.arange(sources.size), sources] = True
+    frontier = visited.astype(np.float32)
+    level = 0
+
+    while True:
+        level += 1
+        fresh = (frontier @ adjacency > 0) & ~visited
+        rows, cols = np.nonzero(fresh)
+        if rows.size == 0:
+            break
+        visited |= fresh
+        yield level, rows, cols
+        frontier = fresh.astype(np.float32)
+
+
+# Ексцентриситет і сума відстаней для кожного джерела (недосяжні процесори не враховуються).
+# pattern — матриця, отримана з link_pattern.
+def source_statistics(pattern, sources, block_size=None):
+    sources = np.asarray(sources, dtype=np.int64)
+    block_size = block_size or default_block_size(pattern.shape[0])
+    eccentricity = np.zeros(sources.size, dtype=np.int64)
+    row_sums = np.zeros(sources.size, dtype=np.int64)
+
+    for start in range(0, sources.size, block_size):
+        block = sources[start:start + block_size]
+        for level, rows, _ in bfs_levels(pattern, block):
+            counts = np.bincount(rows, minlength=block.size)
+            row_sums[start:start + block.size] += level * counts
+            eccentricity[start:start + block.size][counts > 0] = level
+
+    return eccentricity, row_sums
+
+
+# Щільні рядки матриці відстаней для заданих джерел; недосяжні процесори отримують unreachable
+def hop_distance_rows(pattern, sources, unreachable=-1, dtype=np.int32, block_size=None):
+    sources = np.asarray(sources, dtype=np.int64)
+    block_size = block_size or default_block_size(pattern.shape[0])
+    distances = np.full((sources.size, pattern.shape[0]), unreachable, dtype=dtype)
+    distances[np.arange(sources.size), sources] = 0
+
+    for start in range(0, sources.size, block_size):
+        block = sources[start:start + block_size]
+        for level, rows, cols in bfs_levels(pattern, block):
+            distances[start + rows, cols] = level
+
+    return distances
+
+
+# Вибір рушія пошуку: "sparse" — добуток фронту на CSR-матрицю, "bitset" — упаковані бітові фронти
+def engine_statistics(pattern, sources, block_size=None, engine="sparse"):
+    if engine == "bitset":
+        return bitset_source_statistics(pattern, sources)
+    if engine != "sparse":
+        raise ValueError(f"Невідомий рушій пошуку відстаней: {engine}")
+    return source_statistics(pattern, sources, block_size)
+
+
+# Зведення D та aD за ексцентриситетами і сумами рядків джерел.
+# weights — скільки процесорів представляє кожне джерело (розмір орбіти симетрії).
+def summarize_sources(num_processors, eccentricity, row_sums, weights=None):
+    pairs = num_processors * (num_processors - 1)
+    total = row_sums.sum() if weights is None else np.dot(row_sums, weights)
+
+    return {
+        "D": int(eccentricity.max(initial=0)),
+        "aD": float(total / pairs) if pairs else 0.0,
+        "row_sums": row_sums,
+        "eccentricity": eccentricity,
+    }
+
+
+# D, aD і суми рядків матриці відстаней без побудови самої матриці n x n
+def hop_distance_summary(adjacency_matrix, block_size=None, sources=None, weights=None, engine="sparse"):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    if sources is None:
+        sources = np.arange(num_processors)
+    eccentricity, row_sums = engine_statistics(pattern, sources, block_size, engine)
+    return summarize_sources(num_processors, eccentricity, row_sums, weights)
+
+
+# Найменший беззнаковий тип, у який гарантовано вміщуються всі відстані та позначка недосяжності.
+# Діаметр компоненти не перевищує подвоєного ексцентриситету будь-якої її вершини.
+def distance_dtype(pattern):
+    _, labels = connected_components(pattern, directed=False)
+    _, representatives = np.unique(labels, return_index=True)
+    eccentricity, _ = source_statistics(pattern, representatives)
+    bound = 2 * int(eccentricity.max(initial=0))
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if bound < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+# Повна матриця відстаней у файлі .npy, що заповнюється блоками рядків через memory map,
+# тож в оперативній пам'яті одночасно лежить лише один блок.
+# Недосяжні пари позначаються максимальним значенням типу.
+def write_distance_matrix(adjacency_matrix, path, dtype=None, block_size=None):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    dtype = np.dtype(dtype) if dtype is not None else distance_dtype(pattern)
+    unreachable = np.iinfo(dtype).max
+    block_size = block_size or default_block_size(num_processors)
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(num_processors, num_processors))
+
+    for start in range(0, num_processors, block_size):
+        sources = np.arange(start, min(start + block_size, num_processors))
+        rows = hop_distance_rows(pattern, sources, unreachable=unreachable, dtype=np.int64, block_size=block_size)
+        if rows[rows != unreachable].max(initial=0) >= unreachable:
+            raise ValueError(f"Відстані не вміщуються в тип {dtype}")
+        matrix[start:start + sources.size] = rows
+
+    matrix.flush()
+    del matrix
+    return path
+
+
+# Відкриває збережену матрицю відстаней лише для читання; зрізи підвантажуються з диска за потреби
+def open_distance_matrix(path):
+    return np.load(path, mmap_mode="r")
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+from scipy import io, sparse
+
+from topology.sparse import edge_pairs, link_pattern
+
+# Понад цю кількість процесорів матриця не друкується таблицею: рядки не вміщаються в консоль
+TABLE_LIMIT = 60
+
+
+# Список зв'язків: рядок "i j" на кожен зв'язок (i < j, нумерація від 1), у заголовку — кількість
+# процесорів і зв'язків. Записується одним викликом np.savetxt.
+def write_edge_list(adjacency, path):
+    rows, cols = edge_pairs(adjacency)
+    np.savetxt(path, np.column_stack([rows + 1, cols + 1]), fmt="%d",
+               header=f"{adjacency.shape[0]} {len(rows)}")
+
+
+# Matrix Market (pattern, symmetric): зберігається лише нижній трикутник структури зв'язків
+def write_matrix_market(adjacency, path):
+    io.mmwrite(path, link_pattern(adjacency), field="pattern", symmetry="symmetric")
+
+
+# Двійковий CSR (.npz), читається назад через scipy.sparse.load_npz
+def write_csr(adjacency, path):
+    sparse.save_npz(path, sparse.csr_matrix(adjacency), compressed=True)
+
+
+EXPORT_FORMATS = {
+    ".txt": write_edge_list,
+    ".edges": write_edge_list,
+    ".mtx": write_matrix_market,
+    ".npz": write_csr,
+}
+
+
+# Формат визначається розширенням шляху
+def export_adjacency_matrix(adjacency, path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Невідомий формат експорту: {extension} (підтримуються {', '.join(EXPORT_FORMATS)})")
+    EXPORT_FORMATS[extension](adjacency, path)
+    return path
+
+
+# Таблиця з нумерацією рядків і стовпців від 1, як у початковому виводі лабораторних
+def format_table(adjacency):
+    dense = adjacency.toarray()
+    num_processors = dense.shape[1]
+    cells = np.char.rjust(dense.astype(str), 2)
+    header = "    " + " ".join(np.char.rjust(np.arange(1, num_processors + 1).astype(str), 2)) + " "
+    lines = [f"{i + 1:2}  " + " ".join(row) + " " for i, row in enumerate(cells)]
+    return "\n".join([header] + lines)
+
+
+def print_adjacency_matrix(adjacency, limit=TABLE_LIMIT):
+    num_processors = adjacency.shape[0]
+    if num_processors > limit:
+        print(f"Матриця суміжності ({num_processors} процесорів, {sparse.triu(adjacency, k=1).nnz} зв'язків) "
+              f"завелика для консолі; збережіть її через export_adjacency_matrix (.txt, .mtx, .npz).")
+        return
+    print("Матриця суміжності з нумерацією від 1 до n:")
+    print(format_table(adjacency))
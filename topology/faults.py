@@ -0,0 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from topology.distances import source_statistics
+from topology.parallel import CHUNKS_PER_WORKER, resolve_workers
+from topology.sparse import edge_pairs, link_pattern
+
+FAILURE_KINDS = ["link", "processor", "cluster"]
+SUMMARY_METRICS = ["D", "aD", "Disconnected pairs", "Largest component", "Components"]
+SUMMARY_PERCENTILES = [5, 50, 95]
+
+_worker_state = {}
+
+
+# Незмінна основа для всіх сценаріїв: CSR зв'язків, список ребер (i < j) і номер ребра для кожного
+# елемента CSR, щоб відмову ребра можна було накласти маскою на обидва його напрямки
+def failure_base(adjacency_matrix):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    rows, cols = edge_pairs(pattern)
+    entry_rows = np.repeat(np.arange(num_processors), np.diff(pattern.indptr))
+    entry_cols = pattern.indices.astype(np.int64)
+    edge_keys = rows.astype(np.int64) * num_processors + cols
+    order = np.argsort(edge_keys)
+    entry_keys = np.minimum(entry_rows, entry_cols) * num_processors + np.maximum(entry_rows, entry_cols)
+    entry_edges = order[np.searchsorted(edge_keys[order], entry_keys)]
+    return {"pattern": pattern, "rows": rows, "cols": cols, "entry_rows": entry_rows, "entry_edges": entry_edges}
+
+
+# Процесори, що відмовили, для сценарію: окремі процесори або всі процесори кластерів
+def failed_processors(kind, failed, cluster_size):
+    if kind == "processor":
+        return np.asarray(failed, dtype=np.int64)
+    if kind == "cluster":
+        return (np.asarray(failed, dtype=np.int64)[:, None] * cluster_size + np.arange(cluster_size)).ravel()
+    return np.empty(0, dtype=np.int64)
+
+
+# CSR без зв'язків, що відмовили (і зв'язків процесорів, що відмовили): маска по елементах основи
+def masked_pattern(base, failed_links=(), dead=None):
+    pattern = base["pattern"]
+    alive = np.ones(base["rows"].size, dtype=bool)
+    alive[np.asarray(failed_links, dtype=np.int64)] = False
+    if dead is not None:
+        alive &= ~(dead[base["rows"]] | dead[base["cols"]])
+
+    keep = alive[base["entry_edges"]]
+    indptr = np.zeros(pattern.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(base["entry_rows"][keep], minlength=pattern.shape[0]), out=indptr[1:])
+    return sparse.csr_matrix((np.ones(int(keep.sum()), dtype=np.int32), pattern.indices[keep], indptr),
+                             shape=pattern.shape)
+
+
+# Характеристики одного сценарію на процесорах, що лишились. D і aD рахуються лише по досяжних парах;
+# частка недосяжних пар, кількість компонент і частка найбільшої з них показують розпад мережі.
+def evaluate_scenario(base, kind, failed, cluster_size=None):
+    num_processors = base["pattern"].shape[0]
+    dead = np.zeros(num_processors, dtype=bool)
+    dead[failed_processors(kind, failed, cluster_size)] = True
+    pattern = masked_pattern(base, failed if kind == "link" else (), dead)
+
+    survivors = np.flatnonzero(~dead)
+    _, labels = connected_components(pattern, directed=False)
+    sizes = np.bincount(labels[survivors])
+    reachable = sizes[labels[survivors]] - 1
+    eccentricity, row_sums = source_statistics(pattern, survivors)
+    pairs = survivors.size * (survivors.size - 1)
+
+    return {
+        "Failed": len(failed),
+        "Connected": bool(np.count_nonzero(sizes) <= 1),
+        "Components": int(np.count_nonzero(sizes)),
+        "Largest component": int(sizes.max(initial=0)) / max(survivors.size, 1),
+        "Disconnected pairs": float(1 - reachable.sum() / pairs) if pairs else 0.0,
+        "D": int(eccentricity.max(initial=0)),
+        "aD": float(row_sums.sum() / reachable.sum()) if reachable.sum() else 0.0,
+    }
+
+
+# Випадкові сценарії: у кожному відмовляють failures різних ланок заданого виду
+def sample_failures(base, kind, failures, scenarios, cluster_size=None, seed=0):
+    num_processors = base["pattern"].shape[0]
+    if kind == "link":
+        total = base["rows"].size
+    elif kind == "processor":
+        total = num_processors
+    elif kind == "cluster":
+        if not cluster_size:
+            raise ValueError("Для відмов кластерів потрібен cluster_size")
+        total = num_processors // cluster_size
+    else:
+        raise ValueError(f"Невідомий вид відмов: {kind} (підтримуються {', '.join(FAILURE_KINDS)})")
+    if failures > total:
+        raise ValueError(f"Неможливо вимкнути {failures} з {total} ({kind})")
+
+    rng = np.random.default_rng(seed)
+    return [np.sort(rng.choice(total, size=failures, replace=False)) for _ in range(scenarios)]
+
+
+def _init_worker(adjacency_matrix):
+    _worker_state["base"] = failure_base(adjacency_matrix)
+
+
+def _evaluate_chunk(kind, chunk, cluster_size):
+    return [evaluate_scenario(_worker_state["base"], kind, failed, cluster_size) for failed in chunk]
+
+
+# Розподіл кожної характеристики по сценаріях
+def summarize_scenarios(records):
+    summary = {"Scenarios": len(records),
+               "Connected fraction": float(np.mean([record["Connected"] for record in records])) if records else 0.0}
+    for metric in SUMMARY_METRICS:
+        values = np.array([record[metric] for record in records], dtype=np.float64)
+        if values.size == 0:
+            continue
+        percentiles = np.percentile(values, SUMMARY_PERCENTILES)
+        summary[metric] = {
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values.min()),
+            **{f"p{percentile}": float(value) for percentile, value in zip(SUMMARY_PERCENTILES, percentiles)},
+            "max": float(values.max()),
+        }
+    return summary
+
+
+# Аналіз методом Монте-Карло: scenarios випадкових сценаріїв з failures відмовами виду kind
+# ("link", "processor" або "cluster" — тоді потрібен cluster_size). Сценарії не перебудовують матрицю:
+# відмови накладаються маскою на одну основу. workers > 1 (0 — усі ядра) розподіляє сценарії між процесами;
+# самі сценарії визначаються лише seed, тож результат не залежить від кількості процесів.
+def fault_analysis(adjacency_matrix, kind="link", failures=1, scenarios=100, cluster_size=None, seed=0,
+                   workers=None):
+    base = failure_base(adjacency_matrix)
+    samples = sample_failures(base, kind, failures, scenarios, cluster_size, seed)
+    workers = resolve_workers(workers)
+
+    if workers == 1:
+        records = [evaluate_scenario(base, kind, failed, cluster_size) for failed in samples]
+    else:
+        chunk_size = max(1, -(-len(samples) // (workers * CHUNKS_PER_WORKER)))
+        chunks = [samples[start:start + chunk_size] for start in range(0, len(samples), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(base["pattern"],)) as pool:
+            records = [record for chunk_records in
+                       pool.map(_evaluate_chunk, [kind] * len(chunks), chunks, [cluster_size] * len(chunks))
+                       for record in chunk_records]
+
+    return {
+        "Intact": evaluate_scenario(base, kind, np.empty(0, dtype=np.int64), cluster_size),
+        "Scenarios": records,
+        "Summary": summarize_scenarios(records),
+    }
@@ -0,0 +1,127 @@
+import numpy as np
+from scipy import sparse
+
+from topology.distances import hop_distance_rows
+
+# Відстань до недосяжного процесора; сума двох таких значень не переповнює int32
+INFINITY = 1 << 20
+
+
+# Повна матриця відстаней з INFINITY для недосяжних пар
+def full_distance_matrix(pattern):
+    return hop_distance_rows(pattern, np.arange(pattern.shape[0]), unreachable=INFINITY)
+
+
+# Переносить матрицю відстаней у простір з більшою кількістю процесорів (нові поки ізольовані)
+def embed_distances(distances, num_processors):
+    embedded = np.full((num_processors, num_processors), INFINITY, dtype=distances.dtype)
+    embedded[:distances.shape[0], :distances.shape[1]] = distances
+    np.fill_diagonal(embedded, 0)
+    return embedded
+
+
+# Пари процесорів (i < j), з'єднані в first, але не в second
+def link_difference(first, second):
+    difference = sparse.triu(first, k=1).tocsr() - sparse.triu(second, k=1).tocsr()
+    difference = difference.tocoo()
+    lost = difference.data > 0
+    return difference.row[lost], difference.col[lost]
+
+
+# Джерела, відстані від яких може змінити видалення зв'язків. Відстані від u не змінюються,
+# якщо кожен кінець видаленого зв'язку зберіг сусіда, ближчого до u на один крок.
+# pattern — топологія вже без цих зв'язків. Якщо задано limit, перевірка зупиняється, щойно
+# уражених джерел стає більше за limit (тоді повертається лише їхня частина).
+def affected_sources(distances, pattern, rows, cols, limit=None):
+    affected = np.zeros(distances.shape[0], dtype=bool)
+    for endpoint in np.unique(np.concatenate([rows, cols])):
+        level = distances[:, endpoint]
+        neighbours = pattern.indices[pattern.indptr[endpoint]:pattern.indptr[endpoint + 1]]
+        has_parent = (distances[:, neighbours] == (level - 1)[:, None]).any(axis=1)
+        affected |= (level > 0) & (level < INFINITY) & ~has_parent
+        if limit is not None and np.count_nonzero(affected) > limit:
+            break
+    return np.flatnonzero(affected)
+
+
+# Перераховує рядки й стовпці sources матриці відстаней за топологією pattern
+def refresh_sources(distances, pattern, sources):
+    if sources.size:
+        fresh = hop_distance_rows(pattern, sources, unreachable=INFINITY)
+        distances[sources, :] = fresh
+        distances[:, sources] = fresh.T
+    return distances
+
+
+# Видалення зв'язків: BFS повторюється лише для джерел із affected_sources
+def remove_links(distances, pattern, rows, cols, sources=None):
+    if sources is None:
+        sources = affected_sources(distances, pattern, rows, cols)
+    return refresh_sources(distances, pattern, sources)
+
+
+# Видалення одного зв'язку a-b. Змінитися можуть лише відстані між ураженими джерелами, ближчими до a,
+# і ураженими, ближчими до b: найкоротший шлях між двома джерелами з одного боку не проходить через a-b
+# (інакше він довший за шлях через спільний ближчий кінець). Тож BFS достатньо з меншого боку.
+# pattern — топологія вже без цього зв'язку.
+def remove_link(distances, pattern, a, b):
+    sources = affected_sources(distances, pattern, np.array([a]), np.array([b]))
+    near_a = distances[sources, a] < distances[sources, b]
+    side = sources[near_a] if 2 * np.count_nonzero(near_a) <= sources.size else sources[~near_a]
+    return refresh_sources(distances, pattern, side)
+
+
+# Джерела, відстані від яких може змінити додавання зв'язків між наявними процесорами. Рівні BFS від u
+# не змінюються, якщо кінці кожного нового зв'язку на рівнях, що відрізняються не більше ніж на 1.
+def inserted_affected_sources(distances, rows, cols):
+    gaps = np.abs(distances[:, rows] - distances[:, cols]) > 1
+    return np.flatnonzero(gaps.any(axis=1))
+
+
+# Додавання зв'язків між наявними процесорами без BFS: зв'язки вставляються по одному, і для джерел u
+# з inserted_affected_sources відстань до v — мінімум зі старою та шляхів u..a-b..v і u..b-a..v.
+# Кожен зв'язок коштує O(|уражені| * N) замість релаксації всієї матриці.
+def relax_links(distances, rows, cols):
+    for a, b in zip(rows, cols):
+        sources = inserted_affected_sources(distances, [a], [b])
+        if sources.size == 0:
+            continue
+        to_a, to_b = distances[:, a], distances[:, b]
+        fresh = np.minimum(distances[sources, :], to_a[sources, None] + 1 + to_b[None, :])
+        np.minimum(fresh, to_b[sources, None] + 1 + to_a[None, :], out=fresh)
+        distances[sources, :] = fresh
+        distances[:, sources] = fresh.T
+    return distances
+
+
+# Додавання зв'язків і процесорів: новий найкоротший шлях між старими процесорами проходить
+# через старий кінець нового зв'язку, тож достатньо BFS лише з кінців нових зв'язків.
+# pattern — топологія вже з новими зв'язками; new_processors — номери доданих процесорів.
+def insert_links(distances, pattern, rows, cols, new_processors=()):
+    new_processors = np.asarray(new_processors, dtype=np.int64)
+    is_new = np.zeros(distances.shape[0], dtype=bool)
+    is_new[new_processors] = True
+    endpoints = np.unique(np.concatenate([rows, cols]).astype(np.int64))
+    gateways = endpoints[~is_new[endpoints]]
+    sources = np.concatenate([gateways, new_processors])
+    if sources.size == 0:
+        return distances
+
+    fresh = hop_distance_rows(pattern, sources, unreachable=INFINITY)
+    for row in fresh[:gateways.size]:
+        np.minimum(distances, row[:, None] + row[None, :], out=distances)
+    np.minimum(distances, INFINITY, out=distances)
+    distances[sources, :] = fresh
+    distances[:, sources] = fresh.T
+    return distances
+
+
+# D та aD з повної матриці відстаней (недосяжні пари не враховуються)
+def distance_summary(distances):
+    num_processors = distances.shape[0]
+    reachable = distances < INFINITY
+    pairs = num_processors * (num_processors - 1)
+    return {
+        "D": int(distances[reachable].max(initial=0)),
+        "aD": float(distances[reachable].sum() / pairs) if pairs else 0.0,
+    }
@@ -0,0 +1,95 @@
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+from topology.cache import cached_properties
+from topology.metrics import calculate_topological_properties
+from topology.parallel import resolve_workers
+from topology.render import DEFAULT_DPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Лабораторна, у якій побудовано кожну топологію, і підпис для графіків
+TOPOLOGIES = {
+    "star": "Lab1",
+    "ring": "Lab2",
+    "grid": "Lab3",
+}
+TOPOLOGY_LABELS = {
+    "star": "Зірка",
+    "ring": "Кільце",
+    "grid": "Решітка",
+}
+
+_modules = {}
+
+
+# Завантажує main.py потрібної лабораторної як модуль (усі вони мають однакову назву файлу)
+def load_lab(topology):
+    if topology not in _modules:
+        path = os.path.join(ROOT, TOPOLOGIES[topology], "main.py")
+        spec = importlib.util.spec_from_file_location(f"lab_{topology}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[topology] = module
+    return _modules[topology]
+
+
+# Характеристики за замкненими формулами лабораторної (closed_form_properties), якщо вона їх має
+# і вони діють для цієї кількості кластерів; інакше None
+def formula_properties(lab, num_clusters):
+    closed_form = getattr(lab, "closed_form_properties", None)
+    return closed_form(num_clusters) if closed_form is not None else None
+
+
+# Характеристики топології для кожної кількості кластерів: за формулами, де вони є, інакше обчисленням.
+# use_cache=True бере готові результати з topology.cache і зберігає туди нові.
+def collect_properties(topology, cluster_counts, workers=None, use_cache=False):
+    lab = load_lab(topology)
+    records = []
+
+    for num_clusters in cluster_counts:
+        properties = formula_properties(lab, num_clusters)
+        if properties is None and use_cache:
+            properties = cached_properties(topology, lab, num_clusters, workers=workers)
+        elif properties is None:
+            adjacency_matrix = lab.create_adjacency_matrix(num_clusters)
+            properties = calculate_topological_properties(adjacency_matrix, workers=workers,
+                                                          symmetries=lab.cluster_symmetries(num_clusters))
+        records.append({"Clusters": num_clusters, **properties})
+
+    return records
+
+
+def _use_headless_backend():
+    matplotlib.use("Agg")
+
+
+def _render_step(topology, num_clusters, output_path, dpi):
+    lab = load_lab(topology)
+    lab.visualize_graph(lab.create_adjacency_matrix(num_clusters), num_clusters, output_path=output_path, dpi=dpi)
+    return output_path
+
+
+# Рендерить рисунок кожного кроку у файл <output_dir>/<topology>_step_<K>.<fmt> без дисплея (бекенд Agg).
+# Кроки розподіляються між workers процесами; повертає шляхи до файлів у порядку steps.
+# В одному процесі бекенд після рендерингу повертається попередній, щоб plt.show() і далі показував вікна.
+def render_steps(topology, steps, output_dir, fmt="png", dpi=DEFAULT_DPI, workers=None):
+    os.makedirs(output_dir, exist_ok=True)
+    paths = [os.path.join(output_dir, f"{topology}_step_{num_clusters:03d}.{fmt}") for num_clusters in steps]
+    workers = resolve_workers(workers)
+
+    if workers == 1:
+        previous_backend = matplotlib.get_backend()
+        _use_headless_backend()
+        try:
+            return [_render_step(topology, num_clusters, path, dpi) for num_clusters, path in zip(steps, paths)]
+        finally:
+            matplotlib.use(previous_backend)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_use_headless_backend) as executor:
+        futures = [executor.submit(_render_step, topology, num_clusters, path, dpi)
+                   for num_clusters, path in zip(steps, paths)]
+        return [future.result() for future in futures]
@@ -0,0 +1,72 @@
+import numpy as np
+
+from topology.distances import hop_distance_summary
+from topology.parallel import parallel_hop_distance_summary, resolve_workers
+from topology.sampling import approximate_hop_distances
+from topology.sparse import link_pattern
+from topology.spectral import spectral_properties
+from topology.symmetry import orbit_representatives, verified_symmetries
+
+
+# Функція для обчислення топологічних характеристик.
+# workers > 1 (або 0 — усі ядра) розподіляє пошук відстаней між процесами.
+# symmetries — перестановки-кандидати в автоморфізми; ті, що справді зберігають зв'язки,
+# дозволяють шукати відстані лише від одного представника кожної орбіти.
+# engine="bitset" просуває пошук одразу для 64 джерел на слово (вигідно для малого діаметра).
+# sample_size, time_budget або max_error вмикають наближений режим (див. topology.sampling):
+# D тоді — нижня межа діаметра, а до результату додаються довірчий інтервал aD і верхня межа D.
+# spectral=True додає алгебраїчну зв'язність, спектральний розрив і оцінки ширини бісекції
+# (див. topology.spectral).
+def calculate_topological_properties(adjacency_matrix, block_size=None, workers=None, symmetries=None,
+                                     engine="sparse", sample_size=None, time_budget=None, max_error=None,
+                                     seed=0, confidence=0.95, spectral=False):
+    pattern = link_pattern(adjacency_matrix)
+    properties = hop_distance_properties(pattern, block_size, workers, symmetries, engine, sample_size, time_budget,
+                                         max_error, seed, confidence)
+    if spectral:
+        properties.update(spectral_properties(pattern))
+    return properties
+
+
+def hop_distance_properties(pattern, block_size, workers, symmetries, engine, sample_size, time_budget, max_error,
+                            seed, confidence):
+    num_processors = pattern.shape[0]
+    if sample_size is not None or time_budget is not None or max_error is not None:
+        estimate = approximate_hop_distances(pattern, sample_size=sample_size, time_budget=time_budget,
+                                             max_error=max_error, seed=seed, confidence=confidence,
+                                             engine=engine)
+        properties = assemble_properties(pattern, estimate["D lower bound"], estimate["aD"])
+        properties["aD interval"] = estimate["aD interval"]
+        properties["D upper bound"] = estimate["D upper bound"]
+        properties["Sampled sources"] = estimate["Sampled sources"]
+        return properties
+
+    sources, weights = None, None
+    symmetries = verified_symmetries(pattern, symmetries or [])
+    if symmetries:
+        sources, weights = orbit_representatives(num_processors, symmetries)
+
+    if resolve_workers(workers) > 1:
+        summary = parallel_hop_distance_summary(pattern, workers=workers, block_size=block_size,
+                                                sources=sources, weights=weights, engine=engine)
+    else:
+        summary = hop_distance_summary(pattern, block_size=block_size, sources=sources, weights=weights,
+                                       engine=engine)
+    return assemble_properties(pattern, summary["D"], summary["aD"])
+
+
+# Доповнює D та aD характеристиками, що залежать лише від зв'язків: S, C, T
+def assemble_properties(pattern, d, ad):
+    num_processors = pattern.shape[0]
+    s = int(np.diff(pattern.indptr).max(initial=0))
+    c = pattern.nnz // 2
+    t = (2 * ad) / s
+
+    return {
+        "Number of processors": num_processors,
+        "D": d,
+        "aD": ad,
+        "S": s,
+        "C": c,
+        "T": t
+    }
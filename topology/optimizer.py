@@ -0,0 +1,246 @@
+import time
+
+import numpy as np
+from scipy import sparse
+
+from topology.distances import DENSE_BFS_LIMIT
+from topology.incremental import INFINITY, full_distance_matrix, relax_links, remove_link, remove_links
+from topology.rules import LinkRule, build_adjacency_matrix, compile_rule
+from topology.sparse import symmetric_csr
+
+# Цільові функції (менше — краще) від D, aD, S і C топології
+OBJECTIVES = {
+    "aD*C": lambda properties: properties["aD"] * properties["C"],
+    "T": lambda properties: 2 * properties["aD"] / properties["S"],
+}
+# Початкова "температура" відпалу — допустиме відносне погіршення цільової функції
+INITIAL_TEMPERATURE = 0.05
+FINAL_TEMPERATURE = 1e-4
+# Скільки зв'язків хід може змінити, щоб на малих графах оцінюватися інкрементно
+RELAX_LINKS = 4
+
+
+# Кандидати в нерегулярні зв'язки: кожна пара процесорів (source, target) для кожного зсуву кластерів
+# і кожного періоду; з wrap зв'язки, що виходять за останній кластер, замикаються на кластер wrap
+def candidate_rules(cluster_size, shifts=(1, 2), periods=(1, 2), wrap=0):
+    rules = []
+    for shift in shifts:
+        for period in periods:
+            for residue in range(period):
+                for source in range(cluster_size):
+                    for target in range(cluster_size):
+                        rules.append(LinkRule(source, target, shift=shift, period=period, residues=(residue,),
+                                              wrap=wrap))
+    return rules
+
+
+# Кандидати для ходів по одному зв'язку: кожна пара процесорів (source, target) між кластером c
+# і кластером c + shift (з wrap — за модулем кількості кластерів). Зв'язок задається правилом, що діє
+# лише для кластера c, тож результат будується тим самим build_adjacency_matrix.
+def candidate_links(cluster_size, num_clusters, shifts=(1, 2), wrap=True):
+    rules, seen = [], set()
+    for shift in shifts:
+        for cluster in range(num_clusters):
+            destination = (cluster + shift) % num_clusters if wrap else cluster + shift
+            if destination == cluster or not 0 <= destination < num_clusters:
+                continue
+            for source in range(cluster_size):
+                for target in range(cluster_size):
+                    pair = tuple(sorted((cluster * cluster_size + source, destination * cluster_size + target)))
+                    if pair in seen:
+                        continue
+                    seen.add(pair)
+                    rules.append(LinkRule(source, target, cluster=destination, first=cluster, period=num_clusters,
+                                          residues=(cluster,)))
+    return rules
+
+
+# Зв'язки правила як список пар процесорів (i, j), i < j
+def _rule_pairs(rule, cluster_size, num_clusters):
+    rows, cols = compile_rule(rule, cluster_size, num_clusters)
+    distinct = rows != cols
+    return list(zip(np.minimum(rows, cols)[distinct].tolist(), np.maximum(rows, cols)[distinct].tolist()))
+
+
+# Зміна кратностей зв'язків (скільки правил дає кожен зв'язок; словник {(i, j): кратність}) на sign
+# для правил rule_ids; повертає зв'язки, що зникли (кратність стала 0) або з'явилися (стала 1)
+def _update_counts(counts, rule_pairs, rule_ids, sign):
+    changed = []
+    for rule_id in rule_ids:
+        for pair in rule_pairs[rule_id]:
+            count = counts.get(pair, 0) + sign
+            if count:
+                counts[pair] = count
+            else:
+                del counts[pair]
+            if count == (0 if sign < 0 else 1):
+                changed.append(pair)
+    return changed
+
+
+# Нова CSR-структура без зв'язків lost і з новими зв'язками gained. Позиції — відсортовані ключі
+# рядок * N + стовпець; зміна вставляє й видаляє ключі за searchsorted, без арифметики розріджених
+# матриць (вона тут дорожча за саму оцінку ходу)
+def _change_links(pattern, lost, gained):
+    if not lost and not gained:
+        return pattern
+    num_processors = pattern.shape[0]
+    keys = np.repeat(np.arange(num_processors), np.diff(pattern.indptr)) * num_processors + pattern.indices
+    for pairs, sign in ((lost, -1), (gained, 1)):
+        if not pairs:
+            continue
+        rows, cols = np.array(pairs, dtype=np.int64).T
+        changed = np.sort(np.concatenate([rows * num_processors + cols, cols * num_processors + rows]))
+        positions = np.searchsorted(keys, changed)
+        keys = np.insert(keys, positions, changed) if sign > 0 else np.delete(keys, positions)
+    indptr = np.searchsorted(keys, np.arange(num_processors + 1) * num_processors)
+    return sparse.csr_matrix((np.ones(keys.size, dtype=np.int32), keys % num_processors, indptr),
+                             shape=pattern.shape)
+
+
+def _properties(distances, degrees, num_links):
+    num_processors = distances.shape[0]
+    if num_processors > 1 and distances.max() >= INFINITY:
+        return None  # Розірвана топологія не розглядається
+    pairs = max(num_processors * (num_processors - 1), 1)
+    return {
+        "D": int(distances.max(initial=0)),
+        "aD": float(distances.sum() / pairs),
+        "S": int(degrees.max(initial=0)),
+        "C": num_links,
+    }
+
+
+# Оцінка ходу: прибираються правила removed і додаються added. Кратності змінюються на місці
+# (якщо хід не прийнято, їх повертає _revert); повертається новий стан і його характеристики.
+# Інкрементно (incremental=True) нові зв'язки вставляються ослабленням рядків, які вони змінюють
+# (relax_links), а потім для зниклих зв'язків BFS повторюється лише з уражених джерел (remove_links;
+# для одного зв'язку — remove_link, лише з одного боку).
+# Інакше відстані перераховуються повністю.
+def _evaluate_move(state, rule_pairs, removed, added, incremental=True):
+    lost = _update_counts(state["counts"], rule_pairs, removed, -1)
+    gained = _update_counts(state["counts"], rule_pairs, added, 1)
+    kept = set(lost) & set(gained)  # Зв'язок, який дають і прибране, і додане правило, лишається
+    lost = [pair for pair in lost if pair not in kept]
+    gained = [pair for pair in gained if pair not in kept]
+
+    # Малі графи BFS обходить щільним добутком (див. DENSE_BFS_LIMIT), і хід правилом, що змінює багато
+    # зв'язків, там дешевше перерахувати повністю
+    num_processors = state["distances"].shape[0]
+    if len(lost) + len(gained) > RELAX_LINKS and num_processors <= DENSE_BFS_LIMIT:
+        incremental = False
+    # Якщо зв'язки лише додаються, структура потрібна тільки для прийнятого ходу (див. _settle)
+    pattern = _change_links(state["pattern"], lost, gained) if lost or not incremental else None
+    if not incremental:
+        distances = full_distance_matrix(pattern)
+    else:
+        distances = state["distances"]
+        if gained:
+            rows, cols = np.array(gained, dtype=np.int64).T
+            distances = relax_links(distances.copy(), rows, cols)
+        if lost:
+            if distances is state["distances"]:
+                distances = distances.copy()
+            if len(lost) == 1:
+                distances = remove_link(distances, pattern, *lost[0])
+            else:
+                rows, cols = np.array(lost, dtype=np.int64).T
+                distances = remove_links(distances, pattern, rows, cols)
+
+    degrees = state["degrees"]
+    if lost or gained:
+        degrees = degrees.copy()
+        for pairs, sign in ((lost, -1), (gained, 1)):
+            if pairs:
+                np.add.at(degrees, np.array(pairs, dtype=np.int64).ravel(), sign)
+
+    moved = {"counts": state["counts"], "pattern": pattern, "distances": distances, "degrees": degrees,
+             "previous": state["pattern"], "gained": gained}
+    return moved, _properties(distances, degrees, len(state["counts"]))
+
+
+# Стан прийнятого ходу з добудованою структурою зв'язків
+def _settle(moved):
+    pattern = moved["pattern"]
+    if pattern is None:
+        pattern = _change_links(moved["previous"], [], moved["gained"])
+    return {"counts": moved["counts"], "pattern": pattern, "distances": moved["distances"],
+            "degrees": moved["degrees"]}
+
+
+def _revert(counts, rule_pairs, removed, added):
+    _update_counts(counts, rule_pairs, added, -1)
+    _update_counts(counts, rule_pairs, removed, 1)
+
+
+# Імітація відпалу над набором правил з candidates (на додачу до незмінних fixed_rules).
+# Ходи: додати правило, прибрати правило або замінити одне на інше; кожен оцінюється інкрементним
+# оновленням матриці відстаней (див. _evaluate_move). Правило з candidate_rules дає по зв'язку на кожен
+# кластер, тож хід зачіпає більшість джерел; ходи по одному зв'язку (candidate_links) оновлюються значно
+# дешевше. link_budget обмежує загальну кількість зв'язків C.
+# Повертає найкращий знайдений набір правил і його характеристики.
+def optimize_links(cluster_size, num_clusters, intra_links, fixed_rules, candidates, objective="aD*C",
+                   link_budget=None, initial=(), iterations=2000, seed=0,
+                   initial_temperature=INITIAL_TEMPERATURE, final_temperature=FINAL_TEMPERATURE, incremental=True):
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Невідома цільова функція: {objective} (підтримуються {', '.join(OBJECTIVES)})")
+    score = OBJECTIVES[objective]
+    rng = np.random.default_rng(seed)
+    candidates = list(candidates)
+    rule_pairs = [_rule_pairs(rule, cluster_size, num_clusters) for rule in candidates]
+
+    base = build_adjacency_matrix(cluster_size, num_clusters, intra_links, fixed_rules)
+    upper = sparse.triu(base, k=1).tocoo()
+    counts = dict.fromkeys(zip(upper.row.tolist(), upper.col.tolist()), 1)
+    selected = np.zeros(len(candidates), dtype=bool)
+    initial = [candidates.index(rule) for rule in initial]
+    selected[initial] = True
+    _update_counts(counts, rule_pairs, initial, 1)
+
+    rows, cols = np.array(list(counts), dtype=np.int64).reshape(-1, 2).T
+    pattern = symmetric_csr(base.shape[0], rows, cols).astype(np.int32)
+    degrees = np.diff(pattern.indptr)
+    state = {"counts": counts, "pattern": pattern, "distances": full_distance_matrix(pattern), "degrees": degrees}
+    properties = _properties(state["distances"], degrees, len(counts))
+    current = score(properties) if properties else np.inf
+    best = {"value": current, "selected": selected.copy(), "properties": properties}
+    evaluated = accepted = 0
+    started = time.perf_counter()
+    cooling = (final_temperature / initial_temperature) ** (1 / max(iterations - 1, 1))
+    temperature = initial_temperature
+
+    for _ in range(iterations):
+        chosen, free = np.flatnonzero(selected), np.flatnonzero(~selected)
+        moves = [move for move, possible in (("add", free.size), ("remove", chosen.size),
+                                             ("swap", chosen.size and free.size)) if possible]
+        if not moves:
+            break
+        move = moves[rng.integers(len(moves))]
+        removed = [int(rng.choice(chosen))] if move in ("remove", "swap") else []
+        added = [int(rng.choice(free))] if move in ("add", "swap") else []
+
+        moved, new_properties = _evaluate_move(state, rule_pairs, removed, added, incremental)
+        evaluated += 1
+        feasible = new_properties is not None and (link_budget is None or new_properties["C"] <= link_budget)
+        value = score(new_properties) if feasible else np.inf
+        change = (value - current) / abs(current) if np.isfinite(current) else -np.inf
+        if feasible and (change <= 0 or rng.random() < np.exp(-change / temperature)):
+            state, properties, current = _settle(moved), new_properties, value
+            selected[removed] = False
+            selected[added] = True
+            accepted += 1
+            if current < best["value"]:
+                best = {"value": current, "selected": selected.copy(), "properties": properties}
+        else:
+            _revert(state["counts"], rule_pairs, removed, added)
+        temperature *= cooling
+
+    elapsed = time.perf_counter() - started
+    return {
+        "Rules": [candidates[i] for i in np.flatnonzero(best["selected"])],
+        "Objective": float(best["value"]),
+        "Properties": best["properties"],
+        "Evaluated": evaluated,
+        "Accepted": accepted,
+        "Evaluations per second": evaluated / elapsed if elapsed else float("inf"),
+    }
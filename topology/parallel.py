@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy import sparse
+
+from topology.distances import engine_statistics, summarize_sources
+from topology.sparse import link_pattern
+
+# Скільки діапазонів джерел припадає на одного працівника (для вирівнювання навантаження)
+CHUNKS_PER_WORKER = 4
+
+_worker_state = {}
+
+
+def resolve_workers(workers):
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def _share_array(array):
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach_array(descriptor):
+    name, shape, dtype = descriptor
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+# Кожен процес один раз підключається до спільної CSR-структури
+def _init_worker(num_processors, indptr_descriptor, indices_descriptor, block_size, engine):
+    indptr_block, indptr = _attach_array(indptr_descriptor)
+    indices_block, indices = _attach_array(indices_descriptor)
+    data = np.ones(indices.size, dtype=np.int32)
+    _worker_state["blocks"] = (indptr_block, indices_block)
+    _worker_state["pattern"] = sparse.csr_matrix((data, indices, indptr), shape=(num_processors, num_processors))
+    _worker_state["block_size"] = block_size
+    _worker_state["engine"] = engine
+
+
+def _chunk_statistics(start, sources):
+    eccentricity, row_sums = engine_statistics(_worker_state["pattern"], sources, _worker_state["block_size"],
+                                               _worker_state["engine"])
+    return start, eccentricity, row_sums
+
+
+# Те саме, що hop_distance_summary, але діапазони джерел обробляються пулом процесів
+def parallel_hop_distance_summary(adjacency_matrix, workers=None, chunk_size=None, block_size=None,
+                                  sources=None, weights=None, engine="sparse"):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    if sources is None:
+        sources = np.arange(num_processors)
+    sources = np.asarray(sources, dtype=np.int64)
+    workers = resolve_workers(workers)
+    chunk_size = chunk_size or max(1, -(-sources.size // (workers * CHUNKS_PER_WORKER)))
+    eccentricity = np.zeros(sources.size, dtype=np.int64)
+    row_sums = np.zeros(sources.size, dtype=np.int64)
+
+    indptr_block, indptr_descriptor = _share_array(pattern.indptr)
+    indices_block, indices_descriptor = _share_array(pattern.indices)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(num_processors, indptr_descriptor, indices_descriptor,
+                                           block_size, engine)) as pool:
+            starts = range(0, sources.size, chunk_size)
+            chunks = [sources[start:start + chunk_size] for start in starts]
+            for start, chunk_eccentricity, chunk_row_sums in pool.map(_chunk_statistics, starts, chunks):
+                eccentricity[start:start + chunk_eccentricity.size] = chunk_eccentricity
+                row_sums[start:start + chunk_row_sums.size] = chunk_row_sums
+    finally:
+        for block in (indptr_block, indices_block):
+            block.close()
+            block.unlink()
+
+    return summarize_sources(num_processors, eccentricity, row_sums, weights)
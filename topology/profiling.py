@@ -0,0 +1,105 @@
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows: пік RSS недоступний
+    resource = None
+
+# Шлях до JSON-трасування; якщо змінна задана, трасування вмикається під час імпорту
+TRACE_ENV = "TOPOLOGY_TRACE"
+# Шлях для дампу cProfile (читається через pstats)
+PROFILE_ENV = "TOPOLOGY_PROFILE"
+# Непорожнє значення вмикає підрахунок піку виділеної пам'яті через tracemalloc (помітно сповільнює)
+ALLOCATIONS_ENV = "TOPOLOGY_TRACE_ALLOCATIONS"
+
+_trace = {"enabled": False}
+
+
+def enable_tracing(trace_path, profile_path=None, allocations=False):
+    _trace.update(enabled=True, path=trace_path, stages=[], started=time.perf_counter(), allocations=allocations,
+                  profile_path=profile_path, profiler=None)
+    if allocations:
+        tracemalloc.start()
+    if profile_path:
+        _trace["profiler"] = cProfile.Profile()
+        _trace["profiler"].enable()
+
+
+def tracing_enabled():
+    return _trace["enabled"]
+
+
+def peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux повертає кілобайти
+
+
+# Розміри матриці суміжності для запису етапу
+def matrix_details(adjacency):
+    return {
+        "processors": adjacency.shape[0],
+        "links": adjacency.nnz // 2,
+        "matrix_bytes": adjacency.data.nbytes + adjacency.indices.nbytes + adjacency.indptr.nbytes,
+    }
+
+
+# Вимірює етап: час (загальний і процесорний), пік RSS процесу після етапу та, за потреби, пік виділень.
+# Повертає словник, до якого можна дописати подробиці (наприклад matrix_details). Коли трасування
+# вимкнене, лише повертає порожній словник.
+@contextmanager
+def stage(name, **details):
+    if not _trace["enabled"]:
+        yield {}
+        return
+
+    record = {"stage": name, **details}
+    if _trace["allocations"]:
+        tracemalloc.reset_peak()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record["wall_seconds"] = time.perf_counter() - wall_start
+        record["cpu_seconds"] = time.process_time() - cpu_start
+        record["peak_rss_bytes"] = peak_rss_bytes()
+        if _trace["allocations"]:
+            record["peak_allocated_bytes"] = tracemalloc.get_traced_memory()[1]
+        _trace["stages"].append(record)
+
+
+# Записує трасування (і дамп cProfile) та вимикає його; без увімкненого трасування нічого не робить
+def write_trace():
+    if not _trace["enabled"]:
+        return None
+
+    if _trace["profiler"] is not None:
+        _trace["profiler"].disable()
+        _trace["profiler"].dump_stats(_trace["profile_path"])
+    if _trace["allocations"]:
+        tracemalloc.stop()
+
+    trace = {
+        "command": sys.argv,
+        "total_wall_seconds": time.perf_counter() - _trace["started"],
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": _trace["stages"],
+        "profile": _trace["profile_path"],
+    }
+    with open(_trace["path"], "w", encoding="utf-8") as file:
+        json.dump(trace, file, indent=2)
+
+    path = _trace["path"]
+    _trace["enabled"] = False
+    return path
+
+
+if os.environ.get(TRACE_ENV):
+    enable_tracing(os.environ[TRACE_ENV], os.environ.get(PROFILE_ENV), bool(os.environ.get(ALLOCATIONS_ENV)))
@@ -0,0 +1,65 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+
+# Кількість відрізків, якими наближається вигнутий зв'язок
+ARC_SEGMENTS = 16
+# Понад цю кількість процесорів номери вузлів не підписуються: вони все одно нечитабельні,
+# а малювання тисяч текстів займає більшу частину часу рендерингу
+LABEL_LIMIT = 300
+DEFAULT_DPI = 100
+
+
+# Точки кривих, які малює connectionstyle="arc3,rad=...": квадратична крива Безьє, контрольна
+# точка якої віддалена від середини відрізка на rad його довжини
+def arc_points(starts, ends, rad, segments=ARC_SEGMENTS):
+    middle = (starts + ends) / 2
+    delta = ends - starts
+    control = middle + rad * np.stack([delta[:, 1], -delta[:, 0]], axis=1)
+    t = np.linspace(0, 1, segments + 1)[None, :, None]
+    return ((1 - t) ** 2 * starts[:, None, :] + 2 * (1 - t) * t * control[:, None, :]
+            + t ** 2 * ends[:, None, :])
+
+
+# Додає зв'язки до групи з однаковим виглядом (колір, стиль, товщина, вигин)
+def add_edges(groups, edges, color, width=1, style="solid", rad=0.0):
+    groups.setdefault((color, style, width, rad), []).extend(edges)
+
+
+# Кожна група малюється однією LineCollection; номери процесорів у зв'язках — від 1
+def draw_edge_groups(ax, positions, groups):
+    for (color, style, width, rad), edges in groups.items():
+        if not edges:
+            continue
+        edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2) - 1
+        starts, ends = positions[edges[:, 0]], positions[edges[:, 1]]
+        if rad:
+            lines = arc_points(starts, ends, rad)
+        else:
+            lines = np.stack([starts, ends], axis=1)
+        ax.add_collection(LineCollection(lines, colors=color, linewidths=width, linestyles=style, zorder=1))
+
+
+# Вузли та їхні номери (від 1) поверх зв'язків
+def draw_nodes(ax, positions, node_size=200, node_color="skyblue", font_size=10, label_limit=LABEL_LIMIT):
+    ax.scatter(positions[:, 0], positions[:, 1], s=node_size, c=node_color, zorder=2)
+    labelled = positions if len(positions) <= label_limit else positions[:0]
+    for i, (x, y) in enumerate(labelled):
+        ax.text(x, y, str(i + 1), fontsize=font_size, fontweight="bold", ha="center", va="center", zorder=3)
+    ax.tick_params(axis="both", which="both", bottom=False, left=False, labelbottom=False, labelleft=False)
+    ax.autoscale_view()
+
+
+# Словник позицій {номер процесора від 1: (x, y)} у масив n x 2
+def position_array(pos, num_processors):
+    return np.array([pos[i + 1] for i in range(num_processors)], dtype=float)
+
+
+# Без output_path показує вікно, як і раніше; інакше зберігає рисунок у файл (формат — за
+# розширенням: png, svg, ...) і закриває його, тож дисплей не потрібен
+def finish_figure(output_path=None, dpi=DEFAULT_DPI):
+    if output_path is None:
+        plt.show()
+        return
+    plt.savefig(output_path, dpi=dpi)
+    plt.close()
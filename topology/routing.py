@@ -0,0 +1,181 @@
+import numpy as np
+
+from topology.distances import BLOCK_CELLS, hop_distance_rows
+from topology.sparse import link_pattern
+from topology.symmetry import orbit_labels, verified_symmetries
+
+
+# Найменший беззнаковий тип, у якому значення до limit уміщуються разом із позначкою "немає" (максимум типу)
+def compact_dtype(limit):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if limit < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+# Порти наступного кроку від кожного процесора до кожного призначення з destinations (масив n x len).
+# Порт — номер сусіда у впорядкованому списку сусідів процесора; обирається сусід з найменшим номером,
+# який на один перехід ближчий до призначення. Відстані до призначень беруться з BFS (граф неорієнтований).
+def next_hop_ports(pattern, destinations, port_dtype):
+    num_processors = pattern.shape[0]
+    indptr, indices = pattern.indptr, pattern.indices
+    degrees = np.diff(indptr)
+    edge_sources = np.repeat(np.arange(num_processors), degrees)
+    edge_ports = np.arange(indices.size) - indptr[edge_sources]
+    no_port = np.iinfo(port_dtype).max
+
+    distances = hop_distance_rows(pattern, destinations)
+    closer = distances[:, indices] == distances[:, edge_sources] - 1
+    candidates = np.where(closer, edge_ports, no_port)
+
+    ports = np.full((len(destinations), num_processors), no_port, dtype=port_dtype)
+    linked = degrees > 0
+    if linked.any():
+        ports[:, linked] = np.minimum.reduceat(candidates, indptr[:-1][linked], axis=1)
+    return ports.T
+
+
+# Перетворення, що переводять представника орбіти в кожен процесор: обхід орбіт під дією перестановок
+# (лише тих, що справді є автоморфізмами). Повертає представника кожного процесора, різні перетворення
+# (масив m x n) і номер перетворення для кожного процесора.
+def orbit_transforms(pattern, symmetries):
+    num_processors = pattern.shape[0]
+    permutations = [np.asarray(permutation) for permutation in verified_symmetries(pattern, symmetries or [])]
+    labels = orbit_labels(num_processors, permutations)
+    _, first = np.unique(labels, return_index=True)
+    representative = first[labels]
+
+    identity = np.arange(num_processors)
+    elements, known = [identity], {identity.tobytes(): 0}
+    element_index = np.full(num_processors, -1, dtype=np.int64)
+    element_index[first] = 0
+    frontier = list(first)
+    while frontier:
+        reached = []
+        for processor in frontier:
+            element = elements[element_index[processor]]
+            for permutation in permutations:
+                image = permutation[processor]
+                if element_index[image] >= 0:
+                    continue
+                composed = permutation[element]
+                key = composed.tobytes()
+                if key not in known:
+                    known[key] = len(elements)
+                    elements.append(composed)
+                element_index[image] = known[key]
+                reached.append(image)
+        frontier = reached
+    return representative, np.array(elements), element_index
+
+
+# Таблиця маршрутизації: для процесора src і призначення dst наступний крок —
+# indices[indptr[src] + port_map[indptr[src] + ports[row_index[src], inverse[element_index[src], dst]]]].
+# Без symmetries рядок портів зберігається для кожного процесора, а inverse і port_map тотожні.
+# symmetries — перестановки-кандидати в автоморфізми (як у calculate_topological_properties): тоді
+# рядок зберігається лише для представника кожної орбіти, призначення переводиться оберненою
+# перестановкою inverse в систему представника, а port_map переводить його порт у порт src.
+# ports має тип uint8/uint16, номери процесорів — uint8/uint16/uint32.
+def build_routing_table(adjacency_matrix, symmetries=None, block_size=None):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    indptr, indices = pattern.indptr, pattern.indices
+    degrees = np.diff(indptr)
+    port_dtype = compact_dtype(degrees.max(initial=0))
+    index_dtype = compact_dtype(num_processors)
+    block_size = block_size or max(1, BLOCK_CELLS // max(pattern.nnz, num_processors, 1))
+
+    representative, elements, element_index = orbit_transforms(pattern, symmetries)
+    rows, row_index = np.unique(representative, return_inverse=True)
+    ports = np.empty((rows.size, num_processors), dtype=port_dtype)
+    for start in range(0, num_processors, block_size):
+        destinations = np.arange(start, min(start + block_size, num_processors))
+        ports[:, destinations] = next_hop_ports(pattern, destinations, port_dtype)[rows]
+
+    # Порт p представника веде до сусіда u; у src йому відповідає сусід element[u] — його порт
+    # знаходиться пошуком у відсортованих списках сусідів
+    edge_sources = np.repeat(np.arange(num_processors), degrees)
+    edge_ports = np.arange(indices.size) - indptr[edge_sources]
+    images = elements[element_index[edge_sources],
+                      indices[indptr[representative[edge_sources]] + edge_ports]]
+    keys = edge_sources * num_processors + indices
+    port_map = np.searchsorted(keys, edge_sources * num_processors + images) - indptr[edge_sources]
+
+    inverse = np.empty_like(elements)
+    np.put_along_axis(inverse, elements, np.arange(num_processors)[None, :], axis=1)
+
+    return {
+        "indptr": indptr.astype(compact_dtype(pattern.nnz)),
+        "indices": indices.astype(index_dtype),
+        "ports": ports,
+        "row_index": row_index.reshape(-1).astype(compact_dtype(rows.size)),
+        "inverse": inverse.astype(index_dtype),
+        "element_index": element_index.astype(compact_dtype(len(elements))),
+        "port_map": port_map.astype(port_dtype),
+    }
+
+
+# Порти наступного кроку в системі src (int64) для масивів пар; максимум типу ports — недосяжні.
+# Єдине перетворення — тотожне (симетрій немає), тоді перетворювати нічого не треба.
+def _source_ports(table, sources, destinations):
+    if table["inverse"].shape[0] == 1:
+        return table["ports"][table["row_index"][sources], destinations].astype(np.int64)
+    no_port = np.iinfo(table["ports"].dtype).max
+    mapped = table["inverse"][table["element_index"][sources], destinations]
+    ports = table["ports"][table["row_index"][sources], mapped].astype(np.int64)
+    routed = ports != no_port
+    offsets = table["indptr"][sources].astype(np.int64)
+    ports[routed] = table["port_map"][offsets[routed] + ports[routed]]
+    return ports
+
+
+# Наступний процесор на найкоротшому шляху src -> dst (нумерація від 0); src, якщо dst == src,
+# і -1, якщо dst недосяжний
+def next_hop(table, src, dst):
+    if src == dst:
+        return src
+    port = _source_ports(table, np.array([src]), np.array([dst]))[0]
+    if port == np.iinfo(table["ports"].dtype).max:
+        return -1
+    return int(table["indices"][int(table["indptr"][src]) + int(port)])
+
+
+# Номери зв'язків (позиції в CSR-списку сусідів) першого кроку для масивів пар (src[i], dst[i]);
+# -1, якщо dst[i] == src[i] або недосяжний
+def next_links(table, sources, destinations):
+    sources = np.asarray(sources, dtype=np.int64)
+    destinations = np.asarray(destinations, dtype=np.int64)
+    ports = _source_ports(table, sources, destinations)
+    routed = (ports != np.iinfo(table["ports"].dtype).max) & (sources != destinations)
+
+    links = np.full(sources.shape, -1, dtype=np.int64)
+    links[routed] = table["indptr"][sources[routed]].astype(np.int64) + ports[routed]
+    return links
+
+
+# Те саме, що next_hop, для масивів пар (src[i], dst[i])
+def next_hops(table, sources, destinations):
+    sources = np.asarray(sources, dtype=np.int64)
+    links = next_links(table, sources, destinations)
+    routed = links >= 0
+
+    hops = np.full(sources.shape, -1, dtype=np.int64)
+    hops[routed] = table["indices"][links[routed]]
+    same = sources == np.asarray(destinations)
+    hops[same] = sources[same]
+    return hops
+
+
+# Повний шлях src -> dst за таблицею (список процесорів), порожній, якщо dst недосяжний
+def route(table, src, dst):
+    path = [src]
+    while path[-1] != dst:
+        hop = next_hop(table, path[-1], dst)
+        if hop < 0:
+            return []
+        path.append(hop)
+    return path
+
+
+def table_bytes(table):
+    return sum(array.nbytes for array in table.values())
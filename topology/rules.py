@@ -0,0 +1,56 @@
+from collections import namedtuple
+
+import numpy as np
+
+from topology.sparse import symmetric_csr
+
+# Правило зв'язку між кластерами (номери процесорів і кластерів — від 0):
+#   source, target — процесор у кластері-джерелі та процесор у кластері-призначенні
+#   shift          — на скільки кластерів далі розташоване призначення
+#   cluster        — фіксований кластер-призначення замість зсуву
+#   first          — правило діє для кластерів, починаючи з цього
+#   period, residues — правило діє для кластерів, у яких номер % period входить у residues
+#   wrap           — кластер-призначення, якщо зсув виходить за межі топології (None — зв'язку немає)
+#   wrap_skip      — кластери-джерела, для яких зв'язок через wrap не створюється
+LinkRule = namedtuple(
+    "LinkRule",
+    ["source", "target", "shift", "cluster", "first", "period", "residues", "wrap", "wrap_skip"],
+    defaults=(0, None, 0, 1, (0,), None, ()),
+)
+
+
+# Перетворює правило на масиви номерів процесорів-джерел і процесорів-призначень
+def compile_rule(rule, cluster_size, num_clusters):
+    clusters = np.arange(num_clusters)
+    selected = clusters[(clusters >= rule.first) & np.isin(clusters % rule.period, rule.residues)]
+
+    if rule.cluster is not None:
+        destination = np.full(selected.size, rule.cluster)
+        keep = np.full(selected.size, rule.cluster < num_clusters)
+    else:
+        destination = selected + rule.shift
+        outside = (destination < 0) | (destination >= num_clusters)
+        keep = ~outside
+        if rule.wrap is not None and rule.wrap < num_clusters:
+            wrapped = outside & ~np.isin(selected, rule.wrap_skip)
+            destination[wrapped] = rule.wrap
+            keep |= wrapped
+
+    return (selected[keep] * cluster_size + rule.source,
+            destination[keep] * cluster_size + rule.target)
+
+
+# Будує CSR-матрицю суміжності з таблиць зв'язків усередині кластера та між кластерами
+def build_adjacency_matrix(cluster_size, num_clusters, intra_links, inter_links):
+    num_processors = cluster_size * num_clusters
+    bases = np.arange(num_clusters) * cluster_size
+    intra = np.asarray(intra_links, dtype=np.int64).reshape(-1, 2)
+    rows = [(bases[:, None] + intra[None, :, 0]).ravel()]
+    cols = [(bases[:, None] + intra[None, :, 1]).ravel()]
+
+    for rule in inter_links:
+        rule_rows, rule_cols = compile_rule(rule, cluster_size, num_clusters)
+        rows.append(rule_rows)
+        cols.append(rule_cols)
+
+    return symmetric_csr(num_processors, np.concatenate(rows), np.concatenate(cols))
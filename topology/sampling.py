@@ -0,0 +1,61 @@
+import time
+from statistics import NormalDist
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from topology.distances import engine_statistics
+from topology.sparse import link_pattern
+
+SAMPLE_BATCH = 64
+
+
+# Наближені aD і D за пошуком у ширину з випадкової (відтворюваної через seed) вибірки джерел.
+# aD — середнє по джерелах від суми відстаней / (n - 1), тож вибіркове середнє його незміщено оцінює.
+# Зупинка: вичерпано sample_size джерел, минуло time_budget секунд або півширина
+# довірчого інтервалу стала не більшою за max_error.
+def approximate_hop_distances(adjacency_matrix, sample_size=None, time_budget=None, max_error=None, seed=0,
+                              confidence=0.95, engine="sparse"):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    order = np.random.default_rng(seed).permutation(num_processors)
+    limit = min(sample_size or num_processors, num_processors)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    started = time.perf_counter()
+    eccentricities, means = [], []
+    half_width = np.inf
+
+    taken = 0
+    while taken < limit:
+        batch = order[taken:min(taken + SAMPLE_BATCH, limit)]
+        eccentricity, row_sums = engine_statistics(pattern, batch, engine=engine)
+        eccentricities.append(eccentricity)
+        means.append(row_sums / max(num_processors - 1, 1))
+        taken += batch.size
+
+        sample = np.concatenate(means)
+        if taken >= num_processors:
+            half_width = 0.0
+        elif taken > 1:
+            # Поправка на скінченну сукупність: вибірка без повторень
+            correction = np.sqrt((num_processors - taken) / (num_processors - 1))
+            half_width = z * sample.std(ddof=1) / np.sqrt(taken) * correction
+        if max_error is not None and half_width <= max_error:
+            break
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            break
+
+    sample = np.concatenate(means) if means else np.zeros(0)
+    eccentricity = np.concatenate(eccentricities) if eccentricities else np.zeros(0, dtype=np.int64)
+    ad = float(sample.mean()) if sample.size else 0.0
+    # Діаметр не менший за будь-який ексцентриситет і не більший за подвоєний (у зв'язній мережі)
+    num_components, _ = connected_components(pattern, directed=False)
+    upper = int(2 * eccentricity.min()) if eccentricity.size and num_components == 1 else None
+
+    return {
+        "aD": ad,
+        "aD interval": (float(ad - half_width), float(ad + half_width)),
+        "D lower bound": int(eccentricity.max(initial=0)),
+        "D upper bound": upper,
+        "Sampled sources": int(sample.size),
+    }
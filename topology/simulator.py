@@ -0,0 +1,116 @@
+import numpy as np
+
+from topology.routing import build_routing_table, next_links
+
+TRAFFIC_PATTERNS = ["uniform", "hotspot", "permutation"]
+# Частка пакетів, що йдуть до гарячих точок у шаблоні "hotspot"
+HOTSPOT_FRACTION = 0.2
+LATENCY_PERCENTILES = [50, 95, 99]
+
+
+# Призначення нових пакетів з процесорів sources відповідно до шаблону трафіку.
+# Для "permutation" кожен процесор завжди надсилає одному й тому самому (permutation[src]).
+def traffic_destinations(pattern, sources, num_processors, rng, hotspots=(0,), hotspot_fraction=HOTSPOT_FRACTION,
+                         permutation=None):
+    if pattern == "permutation":
+        return permutation[sources]
+
+    # Рівномірно серед усіх процесорів, крім самого відправника
+    destinations = rng.integers(0, num_processors - 1, size=sources.size)
+    destinations += destinations >= sources
+
+    if pattern == "hotspot":
+        hot = rng.random(sources.size) < hotspot_fraction
+        destinations[hot] = rng.choice(np.asarray(hotspots), size=int(hot.sum()))
+    elif pattern != "uniform":
+        raise ValueError(f"Невідомий шаблон трафіку: {pattern} (підтримуються {', '.join(TRAFFIC_PATTERNS)})")
+
+    return destinations
+
+
+# Покрокова симуляція комутації пакетів найкоротшими маршрутами з таблиці маршрутизації.
+# На кожному кроці кожен процесор з імовірністю injection_rate створює пакет; кожен направлений зв'язок
+# пропускає не більше link_capacity пакетів за крок, першими — найстаріші (решта чекає в черзі).
+# Затримка — кількість кроків від створення до доставки; статистика рахується лише для пакетів,
+# створених після warmup кроків.
+def simulate_traffic(adjacency_matrix, pattern="uniform", injection_rate=0.1, steps=1000, warmup=100,
+                     link_capacity=1, hotspots=(0,), hotspot_fraction=HOTSPOT_FRACTION, seed=0, table=None):
+    table = table if table is not None else build_routing_table(adjacency_matrix)
+    indices = table["indices"].astype(np.int64)
+    num_processors = adjacency_matrix.shape[0]
+    if num_processors < 2:
+        injection_rate = 0  # Пакетам нема куди йти
+    rng = np.random.default_rng(seed)
+    permutation = rng.permutation(num_processors) if pattern == "permutation" else None
+
+    position = np.empty(0, dtype=np.int64)
+    destination = np.empty(0, dtype=np.int64)
+    birth = np.empty(0, dtype=np.int64)
+    latencies = []
+    injected = measured_injected = dropped = 0
+
+    for step in range(steps):
+        sources = np.flatnonzero(rng.random(num_processors) < injection_rate)
+        targets = traffic_destinations(pattern, sources, num_processors, rng, hotspots, hotspot_fraction,
+                                       permutation)
+        sources, targets = sources[sources != targets], targets[sources != targets]
+        injected += sources.size
+        if step >= warmup:
+            measured_injected += sources.size
+
+        position = np.concatenate([position, sources])
+        destination = np.concatenate([destination, targets])
+        birth = np.concatenate([birth, np.full(sources.size, step, dtype=np.int64)])
+
+        links = next_links(table, position, destination)
+        unreachable = links < 0
+        dropped += int(unreachable.sum())
+        if unreachable.any():
+            position, destination, birth, links = (array[~unreachable] for array in (position, destination, birth,
+                                                                                      links))
+
+        # Арбітраж: у межах кожного зв'язку пакети впорядковуються за часом створення (стабільно),
+        # проходять перші link_capacity
+        order = np.lexsort((birth, links))
+        sorted_links = links[order]
+        group_start = np.flatnonzero(np.r_[True, sorted_links[1:] != sorted_links[:-1]])
+        rank = np.arange(order.size) - np.repeat(group_start, np.diff(np.r_[group_start, order.size]))
+        moving = order[rank < link_capacity]
+        position[moving] = indices[links[moving]]
+
+        arrived = position == destination
+        measured = arrived & (birth >= warmup)
+        latencies.append(step + 1 - birth[measured])
+        keep = ~arrived
+        position, destination, birth = position[keep], destination[keep], birth[keep]
+
+    latencies = np.concatenate(latencies) if latencies else np.empty(0, dtype=np.int64)
+    return traffic_summary(num_processors, steps - warmup, latencies, injected, measured_injected, dropped,
+                           position.size)
+
+
+def traffic_summary(num_processors, measured_steps, latencies, injected, measured_injected, dropped, in_flight):
+    measured_steps = max(measured_steps, 1)
+    summary = {
+        "Injected": injected,
+        "Delivered": int(latencies.size),
+        "Dropped": dropped,
+        "In flight": in_flight,
+        "Offered load": measured_injected / (num_processors * measured_steps),
+        "Throughput": latencies.size / (num_processors * measured_steps),
+        "Latency mean": float(latencies.mean()) if latencies.size else float("nan"),
+        "Latency max": int(latencies.max()) if latencies.size else 0,
+        "Latency histogram": np.bincount(latencies).tolist(),
+    }
+    for percentile, value in zip(LATENCY_PERCENTILES,
+                                 np.percentile(latencies, LATENCY_PERCENTILES) if latencies.size
+                                 else [float("nan")] * len(LATENCY_PERCENTILES)):
+        summary[f"Latency p{percentile}"] = float(value)
+    return summary
+
+
+# Прохід по навантаженнях: та сама топологія й таблиця маршрутизації, різні injection_rate
+def load_sweep(adjacency_matrix, injection_rates, pattern="uniform", **options):
+    table = build_routing_table(adjacency_matrix)
+    return [{"Injection rate": rate, **simulate_traffic(adjacency_matrix, pattern, rate, table=table, **options)}
+            for rate in injection_rates]
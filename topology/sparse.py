@@ -0,0 +1,32 @@
+import numpy as np
+from scipy import sparse
+
+
+# Будує симетричну CSR-матрицю суміжності зі списків напрямлених зв'язків
+def symmetric_csr(num_processors, rows, cols):
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    links = sparse.coo_matrix((np.ones(rows.size, dtype=int), (rows, cols)),
+                              shape=(num_processors, num_processors)).tocsr()
+
+    # Робимо матрицю симетричною, оскільки зв’язки двосторонні
+    adjacency_matrix = (links + links.T).tocsr()
+    # Повторне задання зв'язку (в тому числі у зворотному напрямку) не збільшує його вагу
+    adjacency_matrix.data[:] = 1
+    adjacency_matrix.sort_indices()
+    return adjacency_matrix
+
+
+# Пари з'єднаних процесорів (i < j) з індексацією від 0
+def edge_pairs(adjacency_matrix):
+    upper = sparse.triu(adjacency_matrix, k=1).tocoo()
+    return upper.row, upper.col
+
+
+# Структура зв'язків без ваг: кожен ненульовий елемент стає одиницею
+def link_pattern(adjacency_matrix):
+    pattern = sparse.csr_matrix(adjacency_matrix, copy=True)
+    pattern.eliminate_zeros()
+    pattern.data = np.ones(pattern.nnz, dtype=np.int32)
+    pattern.sort_indices()
+    return pattern
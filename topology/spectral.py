@@ -0,0 +1,105 @@
+import numpy as np
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import eigsh
+
+from topology.sparse import edge_pairs, link_pattern
+
+# До цього розміру спектр рахується повним розкладом: це швидше й надійніше за ітераційний розв'язувач
+DENSE_LIMIT = 600
+# Зсув для shift-invert: лапласіан вироджений, тому розкладається L - SHIFT * I, яка додатно визначена
+SHIFT = -1e-3
+# Найбільша кількість раундів обмінів, що покращують розріз після спектрального розбиття
+REFINE_ROUNDS = 200
+
+
+# Два найменші власні значення лапласіана та власний вектор другого (вектор Фідлера).
+# Для незв'язного графа друге значення дорівнює 0.
+def fiedler_pair(pattern):
+    num_processors = pattern.shape[0]
+    laplacian = csgraph.laplacian(pattern.astype(np.float64))
+
+    if num_processors <= DENSE_LIMIT:
+        values, vectors = np.linalg.eigh(laplacian.toarray())
+    else:
+        values, vectors = eigsh(laplacian.tocsc(), k=2, sigma=SHIFT, which="LM")
+        order = np.argsort(values)
+        values, vectors = values[order], vectors[:, order]
+    return max(float(values[1]), 0.0), vectors[:, 1]
+
+
+# Різниця двох найбільших власних значень матриці суміжності
+def adjacency_spectral_gap(pattern):
+    adjacency = pattern.astype(np.float64)
+    if pattern.shape[0] <= DENSE_LIMIT:
+        values = np.linalg.eigvalsh(adjacency.toarray())[-2:]
+    else:
+        values = np.sort(eigsh(adjacency, k=2, which="LA", return_eigenvectors=False))
+    return float(values[1] - values[0])
+
+
+# Кількість зв'язків між двома частинами розбиття (side — булевий масив належності до першої частини)
+def cut_size(pattern, side):
+    rows, cols = edge_pairs(pattern)
+    return int(np.count_nonzero(side[rows] != side[cols]))
+
+
+# Виграш від перенесення кожного процесора на інший бік: зовнішні зв'язки мінус внутрішні
+def move_gains(pattern, side, edge_sources):
+    external = np.bincount(edge_sources, weights=side[pattern.indices] != side[edge_sources],
+                           minlength=pattern.shape[0])
+    return 2 * external - np.diff(pattern.indptr)
+
+
+# Покращення збалансованого розбиття обмінами пар (у дусі Кернігана–Ліна): у кожному раунді процесори
+# обох частин упорядковуються за виграшем, і обмінюються перші m пар із додатним сумарним виграшем;
+# якщо через сусідство обмінюваних процесорів розріз не зменшився, m зменшується вдвічі
+def refine_bisection(pattern, side, rounds=REFINE_ROUNDS):
+    edge_sources = np.repeat(np.arange(pattern.shape[0]), np.diff(pattern.indptr))
+    cut = cut_size(pattern, side)
+
+    for _ in range(rounds):
+        gains = move_gains(pattern, side, edge_sources)
+        first, second = np.flatnonzero(side), np.flatnonzero(~side)
+        first = first[np.argsort(-gains[first], kind="stable")]
+        second = second[np.argsort(-gains[second], kind="stable")]
+        count = min(first.size, second.size)
+        pairs = np.count_nonzero(gains[first[:count]] + gains[second[:count]] > 0)
+
+        improved = False
+        while pairs > 0:
+            trial = side.copy()
+            trial[first[:pairs]] = False
+            trial[second[:pairs]] = True
+            trial_cut = cut_size(pattern, trial)
+            if trial_cut < cut:
+                side, cut, improved = trial, trial_cut, True
+                break
+            pairs //= 2
+        if not improved:
+            break
+
+    return side, cut
+
+
+# Спектральні характеристики: алгебраїчна зв'язність λ2, спектральний розрив матриці суміжності,
+# ширина бісекції, отримана розрізом за медіаною вектора Фідлера з подальшим покращенням обмінами
+# (досяжна, тобто верхня оцінка), і нижня межа ширини бісекції λ2·|A|·|B|/n (для парного n це λ2·n/4)
+def spectral_properties(adjacency_matrix):
+    pattern = link_pattern(adjacency_matrix)
+    num_processors = pattern.shape[0]
+    if num_processors < 2:
+        return {"Algebraic connectivity": 0.0, "Spectral gap": 0.0, "Bisection width": 0,
+                "Bisection lower bound": 0.0}
+
+    connectivity, fiedler = fiedler_pair(pattern)
+    half = num_processors // 2
+    side = np.zeros(num_processors, dtype=bool)
+    side[np.argsort(fiedler, kind="stable")[:half]] = True
+    side, width = refine_bisection(pattern, side)
+
+    return {
+        "Algebraic connectivity": connectivity,
+        "Spectral gap": adjacency_spectral_gap(pattern),
+        "Bisection width": width,
+        "Bisection lower bound": connectivity * half * (num_processors - half) / num_processors,
+    }
@@ -0,0 +1,86 @@
+import numpy as np
+from scipy import sparse
+
+from topology.incremental import (affected_sources, distance_summary, embed_distances, full_distance_matrix,
+                                  insert_links, link_difference, remove_links)
+from topology.metrics import assemble_properties, calculate_topological_properties
+from topology.sparse import link_pattern
+
+
+# Структура попереднього кроку, доповнена ізольованими процесорами до розміру наступного
+def _embed_pattern(previous, num_processors):
+    padding = num_processors - previous.shape[0]
+    return sparse.block_diag((previous, sparse.csr_matrix((padding, padding), dtype=np.int32)), format="csr")
+
+
+# Чи зберігає наступний крок усі зв'язки поточного (тоді його можна лише доповнити)
+def _only_additions(pattern, upcoming):
+    num_processors = pattern.shape[0]
+    return pattern.multiply(upcoming[:num_processors, :num_processors]).nnz == pattern.nnz
+
+
+# Оновлення відстаней попереднього кроку під нову структуру; None, якщо видалення зв'язків
+# зачіпає більше ніж limit джерел (тоді дешевше обчислити крок заново)
+def _update_distances(previous, distances, pattern, limit):
+    num_processors = pattern.shape[0]
+    old_processors = previous.shape[0]
+    embedded = _embed_pattern(previous, num_processors)
+    embedded_distances = embed_distances(distances, num_processors)
+
+    # Спершу прибираємо зв'язки, яких більше немає, потім додаємо нові
+    kept = link_pattern(embedded.multiply(pattern))
+    lost_rows, lost_cols = link_difference(embedded, pattern)
+    affected = affected_sources(embedded_distances, kept, lost_rows, lost_cols, limit)
+    if affected.size > limit:
+        return None
+    distances = remove_links(embedded_distances, kept, lost_rows, lost_cols, affected)
+    new_rows, new_cols = link_difference(pattern, embedded)
+    return insert_links(distances, pattern, new_rows, new_cols, np.arange(old_processors, num_processors))
+
+
+# Масштабування кластер за кластером. Матриця відстаней попереднього кроку оновлюється лише там,
+# де її змінюють новий кластер і перебудовані міжкластерні зв'язки.
+# На кожному кроці повертає (крок, матриця суміжності, характеристики).
+# Якщо перебудова зачіпає більше ніж rebuild_fraction джерел, крок рахується без матриці відстаней n x n
+# (calculate_topological_properties з кандидатами в симетрії symmetries(step), якщо їх задано).
+# Матриця будується знову лише тоді, коли наступний крок лише додає зв'язки (його завжди можна оновити),
+# або як спроба після паузи, що подвоюється після кожної невдалої спроби.
+def scaling_sweep(create_adjacency_matrix, num_steps, first_step=1, rebuild_fraction=0.5, symmetries=None):
+    previous = None
+    distances = None
+    failures = 0
+    wait = 0
+    # Крок наступний за поточним будується наперед, щоб знати, чи він лише додає зв'язки
+    upcoming_matrix = create_adjacency_matrix(first_step) if first_step <= num_steps else None
+    upcoming = link_pattern(upcoming_matrix) if upcoming_matrix is not None else None
+
+    for step in range(first_step, num_steps + 1):
+        adjacency_matrix, pattern = upcoming_matrix, upcoming
+        if step < num_steps:
+            upcoming_matrix = create_adjacency_matrix(step + 1)
+            upcoming = link_pattern(upcoming_matrix)
+        else:
+            upcoming_matrix = upcoming = None
+
+        if distances is not None:
+            distances = _update_distances(previous, distances, pattern, rebuild_fraction * previous.shape[0])
+            if distances is None:
+                failures += 1
+                wait = 2 ** (failures - 1)
+            else:
+                failures = 0
+
+        if distances is None and upcoming is not None:
+            if wait == 0 or _only_additions(pattern, upcoming):
+                distances = full_distance_matrix(pattern)
+            else:
+                wait -= 1
+
+        previous = pattern
+        if distances is None:
+            properties = calculate_topological_properties(pattern,
+                                                          symmetries=symmetries(step) if symmetries else None)
+        else:
+            summary = distance_summary(distances)
+            properties = assemble_properties(pattern, summary["D"], summary["aD"])
+        yield step, adjacency_matrix, properties
@@ -0,0 +1,57 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from topology.sparse import link_pattern
+
+
+# Циклічний зсув кластерів first_cluster..num_clusters-1 на shift позицій.
+# Повертає перестановку процесорів: permutation[v] — образ процесора v.
+def cluster_rotation(num_clusters, cluster_size, shift=1, first_cluster=0):
+    clusters = np.arange(num_clusters)
+    moved = clusters >= first_cluster
+    span = num_clusters - first_cluster
+    target = clusters.copy()
+    if span > 0:
+        target[moved] = first_cluster + (clusters[moved] - first_cluster + shift) % span
+    offsets = np.arange(cluster_size)
+    return (target[:, None] * cluster_size + offsets[None, :]).ravel()
+
+
+# Дзеркальне відображення порядку кластерів разом з нумерацією процесорів усередині кластера
+def cluster_reflection(num_clusters, cluster_size):
+    processors = np.arange(num_clusters * cluster_size)
+    return processors[::-1].copy()
+
+
+# Чи зберігає перестановка всі зв'язки топології
+def is_automorphism(adjacency_matrix, permutation):
+    pattern = link_pattern(adjacency_matrix).tocoo()
+    permutation = np.asarray(permutation)
+    if permutation.shape != (pattern.shape[0],):
+        return False
+    mapped = sparse.csr_matrix((pattern.data, (permutation[pattern.row], permutation[pattern.col])),
+                               shape=pattern.shape)
+    return (mapped != pattern.tocsr()).nnz == 0
+
+
+# Лише ті перестановки, що справді є автоморфізмами топології
+def verified_symmetries(adjacency_matrix, permutations):
+    return [permutation for permutation in permutations if is_automorphism(adjacency_matrix, permutation)]
+
+
+# Номер орбіти кожного процесора під дією групи, породженої перестановками
+def orbit_labels(num_processors, permutations):
+    processors = np.arange(num_processors)
+    rows = np.concatenate([processors] + [processors for _ in permutations])
+    cols = np.concatenate([processors] + [np.asarray(permutation) for permutation in permutations])
+    links = sparse.csr_matrix((np.ones(rows.size, dtype=np.int8), (rows, cols)),
+                              shape=(num_processors, num_processors))
+    return connected_components(links, directed=False)[1]
+
+
+# Орбіти групи, породженої перестановками: представник і розмір кожної орбіти
+def orbit_representatives(num_processors, permutations):
+    labels = orbit_labels(num_processors, permutations)
+    _, representatives, sizes = np.unique(labels, return_index=True, return_counts=True)
+    return representatives, sizes